@@ -119,3 +119,17 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/1.10/howto/static-files/
 
 STATIC_URL = '/static/'
+
+
+# Simulation
+
+# True to run league operations (season creation, play) with the background
+# job queue, see the run_jobs management command
+NCL_BACKGROUND_JOBS = False
+
+# Cache of the league pages, see ncl_app.caching. Entries are keyed by the
+# leagues' versions, read from the database, so any backend is correct; a
+# cache shared by all the processes (e.g. memcached) gives the most hits.
+NCL_CACHE = 'default'
+
+NCL_CACHE_TIMEOUT = 600
@@ -1,14 +1,47 @@
 from django.contrib import admin
 import ncl_app.models as models
 
+
+class ScheduleChangeAdmin(admin.ModelAdmin):
+    """ Implements the admin of days and matches, which stamps their league
+        with a new version (see League.schedules_changed) since days and
+        matches send no signal
+    """
+
+    @staticmethod
+    def schedule_ids(obj):
+        """ returns the id of the schedule of a day or match, in a list or a queryset """
+        if isinstance(obj, models.Day):
+            return [obj.schedule_id]
+        return models.Day.objects.filter(pk=obj.day_id).values_list('schedule', flat=True)
+
+    def save_model(self, request, obj, form, change):
+        """ saves the day or match and stamps its league """
+        super().save_model(request, obj, form, change)
+        models.League.schedules_changed(self.schedule_ids(obj))
+
+    def delete_model(self, request, obj):
+        """ deletes the day or match and stamps its league """
+        schedule_ids = list(self.schedule_ids(obj))
+        super().delete_model(request, obj)
+        models.League.schedules_changed(schedule_ids)
+
+
 # Register your models here.
 admin.site.register(models.League)
 admin.site.register(models.Conference)
 admin.site.register(models.Division)
 admin.site.register(models.Team)
+admin.site.register(models.Standing, list_select_related=('team',))
 admin.site.register(models.Schedule)
-admin.site.register(models.Day)
+admin.site.register(models.Day, ScheduleChangeAdmin)
 admin.site.register(models.Series)
-admin.site.register(models.Match)
-admin.site.register(models.MatchPart)
+admin.site.register(models.Match, ScheduleChangeAdmin, list_select_related=('day', 'home_team', 'away_team'))
+admin.site.register(models.MatchPart, list_select_related=('team', 'match__day', 'match__home_team',
+                                                           'match__away_team'))
 admin.site.register(models.SeriesPart)
+admin.site.register(models.Job, list_display=('__str__', 'status', 'progress', 'total', 'created'),
+                    list_select_related=('league',))
+admin.site.register(models.Season, list_select_related=('league',))
+admin.site.register(models.ArchivedMatch, list_select_related=('season', 'home_team', 'away_team'))
+admin.site.register(models.ArchivedStanding, list_select_related=('season', 'team'))
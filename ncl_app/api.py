@@ -0,0 +1,291 @@
+import functools
+
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+import ncl_app.models as models
+from ncl_app import history
+
+# Rows per page, unless the page_size parameter asks for another size up to MAX_PAGE_SIZE
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Fields of every resource: (name in the payload, lookup in the database)
+LEAGUE_FIELDS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('postseason', 'postseason'),
+    ('version', 'version'),
+    ('modified', 'modified'),
+)
+DIVISION_FIELDS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('conference_id', 'conference_id'),
+    ('conference', 'conference__name'),
+    ('schedule_id', 'schedule_id'),
+    ('current_day', 'schedule__current_day'),
+    ('completed', 'schedule__completed'),
+    ('post_season_schedule_id', 'post_season_schedule_id'),
+)
+TEAM_FIELDS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('division_id', 'division_id'),
+    ('points', 'points'),
+    ('playoffs', 'playoffs'),
+    ('strength', 'strength'),
+)
+MATCH_FIELDS = (
+    ('id', 'id'),
+    ('day', 'day__number'),
+    ('home_team_id', 'home_team_id'),
+    ('home_team', 'home_team__name'),
+    ('away_team_id', 'away_team_id'),
+    ('away_team', 'away_team__name'),
+    ('score', 'score'),
+    ('home_goals', 'home_goals'),
+    ('away_goals', 'away_goals'),
+    ('outcome', 'outcome'),
+)
+STANDING_FIELDS = (
+    ('team_id', 'team_id'),
+    ('team', 'team__name'),
+    ('played', 'played'),
+    ('wins', 'wins'),
+    ('draws', 'draws'),
+    ('losses', 'losses'),
+    ('goals_for', 'goals_for'),
+    ('goals_against', 'goals_against'),
+    ('goal_difference', 'goal_difference'),
+    ('points', 'points'),
+)
+
+SEASON_FIELDS = (
+    ('id', 'id'),
+    ('number', 'number'),
+    ('archived', 'archived'),
+)
+ARCHIVED_STANDING_FIELDS = (
+    ('season', 'season__number'),
+    ('division_id', 'division_id'),
+    ('division', 'division__name'),
+    ('position', 'position'),
+    ('team_id', 'team_id'),
+    ('team', 'team__name'),
+    ('playoffs', 'playoffs'),
+    ('played', 'played'),
+    ('wins', 'wins'),
+    ('draws', 'draws'),
+    ('losses', 'losses'),
+    ('goals_for', 'goals_for'),
+    ('goals_against', 'goals_against'),
+    ('points', 'points'),
+)
+ARCHIVED_MATCH_FIELDS = (
+    ('id', 'id'),
+    ('season', 'season__number'),
+    ('division_id', 'division_id'),
+    ('stage', 'stage'),
+    ('day', 'day'),
+    ('home_team_id', 'home_team_id'),
+    ('home_team', 'home_team__name'),
+    ('away_team_id', 'away_team_id'),
+    ('away_team', 'away_team__name'),
+    ('home_goals', 'home_goals'),
+    ('away_goals', 'away_goals'),
+    ('outcome', 'outcome'),
+)
+
+
+class ApiError(Exception):
+    """ Raised for a request the API cannot answer, carries the HTTP status """
+
+    def __init__(self, message, status=400):
+        """ initializes the error
+
+        :param message: description of the error
+        :param status: HTTP status of the response
+        """
+        super(ApiError, self).__init__(message)
+        self.status = status
+
+
+def api_view(view):
+    """ turns a function returning a dict into a read-only JSON endpoint """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return JsonResponse(view(request, *args, **kwargs))
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=e.status)
+        except Http404 as e:
+            return JsonResponse({'error': str(e)}, status=404)
+    return require_GET(wrapper)
+
+
+def selected_fields(request, fields):
+    """ returns the fields asked for with the fields parameter, e.g. fields=id,name
+        Only the selected fields are read from the database.
+
+    :param request: the request
+    :param fields: the resource's (name, lookup) pairs
+    :return: the selected (name, lookup) pairs, all of them by default
+    :rtype: list
+    """
+    names = [name for name in request.GET.get('fields', '').split(',') if name]
+    if not names:
+        return list(fields)
+    lookups = dict(fields)
+    unknown = [name for name in names if name not in lookups]
+    if unknown:
+        raise ApiError('Unknown field(s): ' + ', '.join(unknown) + '. Available: ' +
+                       ', '.join(name for name, _ in fields))
+    return [(name, lookups[name]) for name in names]
+
+
+def _int_parameter(request, name, default):
+    """ returns a positive integer query parameter """
+    try:
+        value = int(request.GET.get(name, default))
+    except ValueError:
+        raise ApiError(name + ' must be an integer')
+    if value < 1:
+        raise ApiError(name + ' must be positive')
+    return value
+
+
+def paginate(request, queryset):
+    """ returns the requested page of a queryset, see the page and page_size parameters
+
+    :param request: the request
+    :param queryset: an ordered queryset
+    :return: the page and the pagination part of the payload
+    :rtype: tuple
+    """
+    page_size = min(_int_parameter(request, 'page_size', PAGE_SIZE), MAX_PAGE_SIZE)
+    paginator = Paginator(queryset, page_size)
+    try:
+        page = paginator.page(_int_parameter(request, 'page', 1))
+    except (EmptyPage, PageNotAnInteger) as e:
+        raise ApiError(str(e), status=404)
+
+    return page, {'count': paginator.count, 'page': page.number, 'pages': paginator.num_pages}
+
+
+def rows(request, queryset, fields):
+    """ returns a page of rows of a queryset with the selected fields
+        Rows are read as tuples and turned into dicts, no model instance is
+        created.
+
+    :param request: the request
+    :param queryset: an ordered queryset
+    :param fields: the resource's (name, lookup) pairs
+    :return: the payload
+    :rtype: dict
+    """
+    fields = selected_fields(request, fields)
+    names = [name for name, _ in fields]
+    page, payload = paginate(request, queryset.values_list(*[lookup for _, lookup in fields]))
+    payload['results'] = [dict(zip(names, row)) for row in page.object_list]
+    return payload
+
+
+@api_view
+def leagues(request):
+    """ lists the leagues """
+    return rows(request, models.League.objects.order_by('id'), LEAGUE_FIELDS)
+
+
+@api_view
+def divisions(request, pk):
+    """ lists the divisions of a league, with their schedule's state """
+    league = get_object_or_404(models.League, pk=pk)
+    return rows(request, models.Division.objects.filter(conference__league=league).order_by('conference', 'id'),
+                DIVISION_FIELDS)
+
+
+@api_view
+def teams(request, pk):
+    """ lists the teams of a division """
+    division = get_object_or_404(models.Division, pk=pk)
+    return rows(request, division.team_set.order_by('id'), TEAM_FIELDS)
+
+
+@api_view
+def days(request, pk):
+    """ lists the days of a schedule with their matches, a page is a set of days
+        The fields parameter selects the fields of the matches.
+    """
+    schedule = get_object_or_404(models.Schedule, pk=pk)
+    fields = selected_fields(request, MATCH_FIELDS)
+    names = [name for name, _ in fields]
+    page, payload = paginate(request, schedule.day_set.order_by('number').values_list('id', 'number'))
+
+    day_matches = dict((day_id, []) for day_id, _ in page.object_list)
+    matches = models.Match.objects.filter(day__in=list(day_matches)).order_by('id')
+    for row in matches.values_list('day_id', *[lookup for _, lookup in fields]):
+        day_matches[row[0]].append(dict(zip(names, row[1:])))
+    payload['results'] = [{'number': number, 'matches': day_matches[day_id]} for day_id, number in page.object_list]
+    return payload
+
+
+@api_view
+def matches(request, pk):
+    """ lists the matches of a schedule in playing order
+        The day parameter selects a day, played=1 or played=0 the matches
+        already played or still to be played.
+    """
+    schedule = get_object_or_404(models.Schedule, pk=pk)
+    queryset = models.Match.objects.filter(day__schedule=schedule)
+    if 'day' in request.GET:
+        queryset = queryset.filter(day__number=_int_parameter(request, 'day', 1))
+    if 'played' in request.GET:
+        queryset = queryset.filter(outcome__isnull=request.GET['played'] in ('0', 'false'))
+    return rows(request, queryset.order_by('day__number', 'id'), MATCH_FIELDS)
+
+
+@api_view
+def standings(request, pk):
+    """ lists the table of a schedule, best team first """
+    schedule = get_object_or_404(models.Schedule, pk=pk)
+    return rows(request, schedule.standing_set.order_by(*models.Standing.TABLE_ORDER), STANDING_FIELDS)
+
+
+@api_view
+def seasons(request, pk):
+    """ lists the archived seasons of a league, oldest first """
+    league = get_object_or_404(models.League, pk=pk)
+    return rows(request, history.seasons(league), SEASON_FIELDS)
+
+
+@api_view
+def season_standings(request, pk):
+    """ lists the final tables of an archived season """
+    season = get_object_or_404(models.Season, pk=pk)
+    return rows(request, history.season_standings(season), ARCHIVED_STANDING_FIELDS)
+
+
+@api_view
+def season_matches(request, pk):
+    """ lists the matches of an archived season in playing order
+        The stage parameter (R or P) selects the regular or post season,
+        day a day and team the matches of a team.
+    """
+    season = get_object_or_404(models.Season, pk=pk)
+    stage = request.GET.get('stage')
+    if stage is not None and stage not in dict(models.ArchivedMatch.STAGES):
+        raise ApiError('stage must be one of ' + ', '.join(dict(models.ArchivedMatch.STAGES)))
+    day = _int_parameter(request, 'day', 1) if 'day' in request.GET else None
+    team = get_object_or_404(models.Team, pk=_int_parameter(request, 'team', 1)) if 'team' in request.GET else None
+    return rows(request, history.season_matches(season, stage=stage, day=day, team=team), ARCHIVED_MATCH_FIELDS)
+
+
+@api_view
+def team_history(request, pk):
+    """ lists the final table rows of a team in every archived season, with its totals """
+    team = get_object_or_404(models.Team, pk=pk)
+    payload = rows(request, history.team_seasons(team), ARCHIVED_STANDING_FIELDS)
+    payload['record'] = history.team_record(team)
+    return payload
@@ -0,0 +1,173 @@
+import django
+from django.apps import apps
+from django.db import IntegrityError, connections, transaction
+
+
+def _executemany(model, set_sql, rows):
+    """ runs UPDATE table SET set_sql WHERE pk = %s once per row, with a single executemany
+
+    :param model: model of the rows
+    :param set_sql: SET clause, one %s placeholder per value
+    :param rows: list of parameter lists, the values followed by the primary key
+    :return: number of updated rows
+    :rtype: int
+    """
+    if not rows:
+        return 0
+    connection = connections[model.objects.db]
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(connection.ops.quote_name(model._meta.db_table), set_sql,
+                                                connection.ops.quote_name(model._meta.pk.column))
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+        return cursor.rowcount
+
+
+def bulk_create(objs, queryset):
+    """ inserts many instances of the same model and sets their primary keys
+        bulk_create only returns primary keys on some backends, elsewhere
+        they are read back from the given queryset, which must select
+        exactly the new rows.
+
+    :param objs: list of model instances
+    :param queryset: queryset of the new rows
+    :return: the instances
+    :rtype: list
+    """
+    if not objs:
+        return objs
+    model = type(objs[0])
+    model.objects.bulk_create(objs)
+    if objs[0].pk is None:
+        # rows are numbered in insertion order
+        for obj, pk in zip(objs, queryset.order_by('pk').values_list('pk', flat=True)):
+            obj.pk = pk
+
+    return objs
+
+
+def bulk_update(objs, fields):
+    """ writes the given fields of many instances of the same model
+        All the rows are written by one parameterised UPDATE ... WHERE pk = %s
+        statement run with executemany, so the statement is compiled once and
+        no expression is built per row.
+
+    :param objs: list of model instances
+    :param fields: list of field names
+    :return: number of updated rows
+    :rtype: int
+    """
+    if not objs:
+        return 0
+    model = type(objs[0])
+    model_fields = [model._meta.get_field(name) for name in fields]
+    connection = connections[model.objects.db]
+    quote_name = connection.ops.quote_name
+
+    set_sql = ', '.join('{} = %s'.format(quote_name(field.column)) for field in model_fields)
+    rows = [[field.get_db_prep_save(getattr(obj, field.attname), connection) for field in model_fields] + [obj.pk]
+            for obj in objs]
+    return _executemany(model, set_sql, rows)
+
+
+def bulk_increment(queryset, increments, key='pk'):
+    """ adds per row amounts to integer fields of many rows
+        Rows are written by one parameterised UPDATE of the form
+        field = field + %s ... WHERE pk = %s run with executemany, so
+        concurrent writers never overwrite each other's values. Rows of a
+        queryset are first matched to their primary keys with one query.
+
+    :param queryset: model class or queryset of the rows
+    :param increments: dict of key value -> {field name: amount}
+    :param key: name of the field identifying the rows, unique within queryset
+    :return: number of updated rows
+    :rtype: int
+    """
+    if isinstance(queryset, type):
+        queryset = queryset.objects.all()
+    model = queryset.model
+    field_names = sorted(set(name for amounts in increments.values() for name in amounts))
+    if not field_names:
+        return 0
+    if key == 'pk' and not queryset.query.where:
+        # every key is a row of the table
+        pks = dict((pk, pk) for pk in increments)
+    else:
+        pks = dict(queryset.filter(**{key + '__in': list(increments)}).values_list(key, 'pk'))
+
+    quote_name = connections[queryset.db].ops.quote_name
+    columns = [quote_name(model._meta.get_field(name).column) for name in field_names]
+    set_sql = ', '.join('{0} = {0} + %s'.format(column) for column in columns)
+    rows = [[amounts.get(name, 0) for name in field_names] + [pks[key_value]]
+            for key_value, amounts in increments.items() if key_value in pks]
+    return _executemany(model, set_sql, rows)
+
+
+def _raw_delete(queryset):
+    """ deletes the rows of a queryset with a single DELETE, nothing cascades
+        QuerySet._raw_delete(using) is private, it is only called on the
+        Django versions known to have that signature. Elsewhere the rows are
+        deleted by QuerySet.delete, which also deletes the rows pointing to
+        them.
+
+    :param queryset: queryset of the rows to delete
+    :return: number of deleted rows
+    :rtype: int
+    """
+    if (1, 9) <= django.VERSION[:2] < (2, 0):
+        return queryset._raw_delete(queryset.db)
+    return queryset.delete()[0]
+
+
+def _check_references(connection, deleted_models):
+    """ raises IntegrityError if a row points to a missing row of one of the given models
+        Each foreign key to the models is checked with one LEFT JOIN query.
+
+    :param connection: database connection
+    :param deleted_models: set of concrete models
+    :return: None
+    """
+    quote_name = connection.ops.quote_name
+    for model in apps.get_models(include_auto_created=True):
+        for field in model._meta.local_fields:
+            if not field.is_relation or field.related_model._meta.concrete_model not in deleted_models:
+                continue
+            table, column = model._meta.db_table, field.column
+            referred_table = field.related_model._meta.db_table
+            referred_column = field.target_field.column
+            sql = ('SELECT referring.{pk}, referring.{column} FROM {table} referring '
+                   'LEFT JOIN {referred_table} referred ON referring.{column} = referred.{referred_column} '
+                   'WHERE referring.{column} IS NOT NULL AND referred.{referred_column} IS NULL').format(
+                pk=quote_name(model._meta.pk.column), column=quote_name(column), table=quote_name(table),
+                referred_table=quote_name(referred_table), referred_column=quote_name(referred_column))
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                row = cursor.fetchone()
+            if row is not None:
+                raise IntegrityError('{}.{} of row {} points to the missing {}.{} {}'.format(
+                    table, column, row[0], referred_table, referred_column, row[1]))
+
+
+def bulk_delete(*querysets):
+    """ deletes the rows of querysets, one DELETE per queryset, in the given order
+        Unlike QuerySet.delete, rows are neither loaded nor collected and
+        nothing cascades: querysets must come in dependency order, the rows
+        pointing to a row first. A call out of order raises IntegrityError
+        and deletes nothing: backends without foreign key enforcement
+        (SQLite) check the tables pointing to the deleted ones afterwards,
+        the others enforce the constraints themselves.
+
+    :param querysets: querysets of the rows to delete
+    :return: number of deleted rows
+    :rtype: int
+    """
+    if not querysets:
+        return 0
+    connection = connections[querysets[0].db]
+    deleted = 0
+    with transaction.atomic(using=connection.alias):
+        for queryset in querysets:
+            deleted += _raw_delete(queryset)
+        if not connection.features.supports_foreign_keys:
+            _check_references(connection, set(queryset.model._meta.concrete_model for queryset in querysets))
+
+    return deleted
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.cache import caches
+
+# Seconds a cached league is kept, only to bound the cache's size: an entry
+# never goes stale since every change moves the league to a new version
+DEFAULT_TIMEOUT = 600
+
+
+def get_cache():
+    """ returns the cache used by the app, NCL_CACHE names it among the CACHES """
+    return caches[getattr(settings, 'NCL_CACHE', 'default')]
+
+
+def _league_key(league_id, version, name):
+    """ returns the key of data cached about a league """
+    return 'ncl:league:' + str(league_id) + ':' + str(version) + ':' + name
+
+
+def cached_leagues(name, league_versions, load):
+    """ returns many leagues, from the cache when they have not changed
+        Leagues are cached one by one under their version (see
+        League.changed), the ones missing from the cache are loaded together
+        and cached. Versions are read from the database, so processes sharing
+        the cache never need to tell each other about changes.
+
+    :param name: name of the cached data, e.g. the page showing it
+    :param league_versions: list of (league id, version), in display order
+    :param load: function loading the leagues of a list of ids
+    :return: list of leagues
+    :rtype: list
+    """
+    cache = get_cache()
+    keys = dict((league_id, _league_key(league_id, version, name)) for league_id, version in league_versions)
+    leagues = dict((league.pk, league) for league in cache.get_many(list(keys.values())).values())
+    missing = [league_id for league_id, _ in league_versions if league_id not in leagues]
+    if missing:
+        loaded = dict((league.pk, league) for league in load(missing))
+        cache.set_many(dict((keys[league_id], league) for league_id, league in loaded.items()),
+                       getattr(settings, 'NCL_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+        leagues.update(loaded)
+
+    return [leagues[league_id] for league_id, _ in league_versions if league_id in leagues]
@@ -0,0 +1,194 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+import ncl_app.models as models
+
+# Rows read per query, memory stays bounded by a chunk whatever the history size
+CHUNK_SIZE = 2000
+
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Columns of every record type, in export order; CSV files have all of them
+RECORDS = (
+    ('season', ('id', 'number', 'archived')),
+    ('archived_match', ('id', 'season', 'division', 'stage', 'day', 'home_team', 'away_team', 'score', 'outcome')),
+    ('archived_standing', ('id', 'season', 'division', 'position', 'team', 'playoffs', 'played', 'wins', 'draws',
+                           'losses', 'goals_for', 'goals_against', 'points')),
+    ('day', ('id', 'schedule', 'number')),
+    ('match', ('id', 'schedule', 'day', 'home_team', 'away_team', 'score', 'outcome', 'home_advantage')),
+    ('match_part', ('id', 'match', 'team', 'location')),
+    ('series', ('id', 'schedule', 'length', 'lead_team', 'non_lead_team', 'matches')),
+)
+CSV_COLUMNS = ('record', 'id', 'schedule', 'number', 'day', 'home_team', 'away_team', 'score', 'outcome',
+               'home_advantage', 'match', 'team', 'location', 'length', 'lead_team', 'non_lead_team', 'matches',
+               'archived', 'season', 'division', 'stage', 'position', 'playoffs', 'played', 'wins', 'draws', 'losses',
+               'goals_for', 'goals_against', 'points')
+
+
+def _chunks(queryset, fields, chunk_size):
+    """ yields the rows of a queryset as lists of tuples, one chunk per query
+        Chunks are read in primary key order, each one starting after the
+        last key of the previous one, so no query reads more than chunk_size
+        rows, on any database.
+    """
+    last_pk = None
+    while True:
+        chunk = queryset.order_by('pk')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        chunk = list(chunk.values_list('pk', *fields)[0:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1][0]
+
+
+def _seasons(league, chunk_size):
+    """ yields the archived season records of a league """
+    queryset = models.Season.objects.filter(league=league)
+    for chunk in _chunks(queryset, ('number', 'archived'), chunk_size):
+        for pk, number, archived in chunk:
+            yield {'record': 'season', 'id': pk, 'number': number, 'archived': archived}
+
+
+def _archived_matches(league, chunk_size):
+    """ yields the archived match records of a league, seasons by number """
+    queryset = models.ArchivedMatch.objects.filter(season__league=league)
+    fields = ('season__number', 'division__name', 'stage', 'day', 'home_team__name', 'away_team__name',
+              'home_goals', 'away_goals', 'outcome')
+    for chunk in _chunks(queryset, fields, chunk_size):
+        for pk, season, division, stage, day, home_team, away_team, home_goals, away_goals, outcome in chunk:
+            yield {'record': 'archived_match', 'id': pk, 'season': season, 'division': division, 'stage': stage,
+                   'day': day, 'home_team': home_team, 'away_team': away_team,
+                   'score': str(home_goals) + '-' + str(away_goals), 'outcome': outcome}
+
+
+def _archived_standings(league, chunk_size):
+    """ yields the archived standing records of a league, seasons by number """
+    queryset = models.ArchivedStanding.objects.filter(season__league=league)
+    # record column -> lookup
+    fields = (('season', 'season__number'), ('division', 'division__name'), ('position', 'position'),
+              ('team', 'team__name'), ('playoffs', 'playoffs'), ('played', 'played'), ('wins', 'wins'),
+              ('draws', 'draws'), ('losses', 'losses'), ('goals_for', 'goals_for'),
+              ('goals_against', 'goals_against'), ('points', 'points'))
+    names = ['id'] + [name for name, _ in fields]
+    for chunk in _chunks(queryset, [lookup for _, lookup in fields], chunk_size):
+        for row in chunk:
+            record = {'record': 'archived_standing'}
+            record.update(zip(names, row))
+            yield record
+
+
+def _days(league, chunk_size):
+    """ yields the day records of a league """
+    queryset = models.Day.objects.filter(schedule__in=league.schedules)
+    for chunk in _chunks(queryset, ('schedule__name', 'number'), chunk_size):
+        for pk, schedule, number in chunk:
+            yield {'record': 'day', 'id': pk, 'schedule': schedule, 'number': number}
+
+
+def _matches(league, chunk_size):
+    """ yields the match records of a league """
+    queryset = models.Match.objects.filter(day__schedule__in=league.schedules)
+    fields = ('day__schedule__name', 'day__number', 'home_team__name', 'away_team__name', 'score', 'outcome',
+              'home_advantage')
+    for chunk in _chunks(queryset, fields, chunk_size):
+        for pk, schedule, day, home_team, away_team, score, outcome, home_advantage in chunk:
+            yield {'record': 'match', 'id': pk, 'schedule': schedule, 'day': day, 'home_team': home_team,
+                   'away_team': away_team, 'score': score, 'outcome': outcome, 'home_advantage': home_advantage}
+
+
+def _match_parts(league, chunk_size):
+    """ yields the match part records of a league """
+    queryset = models.MatchPart.objects.filter(match__day__schedule__in=league.schedules)
+    for chunk in _chunks(queryset, ('match_id', 'team__name', 'location'), chunk_size):
+        for pk, match, team, location in chunk:
+            yield {'record': 'match_part', 'id': pk, 'match': match, 'team': team, 'location': location}
+
+
+def _series(league, chunk_size):
+    """ yields the series records of a league, with their teams and matches
+        read for a whole chunk of series at once
+    """
+    queryset = models.Series.objects.filter(schedule__in=league.schedules)
+    for chunk in _chunks(queryset, ('schedule__name', 'length'), chunk_size):
+        series_ids = [row[0] for row in chunk]
+        teams = dict(((series_id, lead), team) for series_id, lead, team in
+                     models.SeriesPart.objects.filter(series__in=series_ids).values_list('series_id', 'lead',
+                                                                                          'team__name'))
+        matches = dict((series_id, []) for series_id in series_ids)
+        series_matches = models.Series.matches.through.objects.filter(series__in=series_ids).order_by('match')
+        for series_id, match_id in series_matches.values_list('series_id', 'match_id'):
+            matches[series_id].append(match_id)
+        for pk, schedule, length in chunk:
+            yield {'record': 'series', 'id': pk, 'schedule': schedule, 'length': length,
+                   'lead_team': teams.get((pk, True)), 'non_lead_team': teams.get((pk, False)),
+                   'matches': matches[pk]}
+
+
+def records(league, chunk_size=CHUNK_SIZE):
+    """ yields the archived seasons of a league, then every day, match,
+        match part and series of its current season as dicts
+        Records are read in chunks, so memory does not grow with the number
+        of stored seasons. Teams, divisions and schedules are exported by
+        name, archived seasons by number.
+
+    :param league: the league
+    :param chunk_size: number of rows read per query
+    :return: generator of records, see RECORDS for their fields
+    """
+    for record_type in (_seasons, _archived_matches, _archived_standings, _days, _matches, _match_parts, _series):
+        for record in record_type(league, chunk_size):
+            yield record
+
+
+class _Echo(object):
+    """ file-like object returning what is written, lets csv.writer produce lines one at a time """
+
+    def write(self, value):
+        """ returns the value instead of storing it """
+        return value
+
+
+def csv_lines(records):
+    """ yields the CSV lines of records, with a header line
+
+    :param records: iterable of records
+    :return: generator of lines
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for record in records:
+        if 'matches' in record:
+            record = dict(record, matches=' '.join(str(match_id) for match_id in record['matches']))
+        yield writer.writerow([record.get(column, '') for column in CSV_COLUMNS])
+
+
+def ndjson_lines(records):
+    """ yields records as lines of JSON
+
+    :param records: iterable of records
+    :return: generator of lines
+    """
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(league, export_format, chunk_size=CHUNK_SIZE):
+    """ yields the export of a league in the given format
+
+    :param league: the league
+    :param export_format: one of FORMATS
+    :param chunk_size: number of rows read per query
+    :return: generator of lines
+    """
+    if export_format == 'csv':
+        return csv_lines(records(league, chunk_size))
+    elif export_format == 'ndjson':
+        return ndjson_lines(records(league, chunk_size))
+    raise ValueError('Unknown export format: ' + export_format)
@@ -0,0 +1,167 @@
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+import ncl_app.models as models
+
+# Columns of an archived table, summed by record_columns
+RECORD_COLUMNS = ('played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against', 'points')
+
+# Playing order of archived matches, the regular season (R) before the post season (P)
+MATCH_ORDER = ('-stage', 'day', 'id')
+
+
+def seasons(league):
+    """ returns the archived seasons of a league, oldest first
+
+    :param league: the league
+    :return: Season queryset
+    :rtype: QuerySet
+    """
+    return models.Season.objects.filter(league=league).order_by('number')
+
+
+def season_standings(season):
+    """ returns the final tables of an archived season, division by division, best team first
+        It reads the (season, team) unique index.
+
+    :param season: the season
+    :return: ArchivedStanding queryset
+    :rtype: QuerySet
+    """
+    return models.ArchivedStanding.objects.filter(season=season).order_by('division', 'position')
+
+
+def season_matches(season, stage=None, day=None, team=None):
+    """ returns the matches of an archived season in playing order
+        It reads the (season, stage, day) index, or the team indexes for
+        the matches of a team.
+
+    :param season: the season
+    :param stage: ArchivedMatch.REGULAR_SEASON or POST_SEASON, both by default
+    :param day: number of a day, all days by default
+    :param team: a team, all teams by default
+    :return: ArchivedMatch queryset
+    :rtype: QuerySet
+    """
+    if team is not None:
+        matches = team_matches(team, season=season)
+    else:
+        matches = models.ArchivedMatch.objects.filter(season=season)
+    if stage is not None:
+        matches = matches.filter(stage=stage)
+    if day is not None:
+        matches = matches.filter(day=day)
+    return matches.order_by(*MATCH_ORDER)
+
+
+def team_matches(team, season=None):
+    """ returns the archived matches of a team, at home or away, in playing order
+        It reads the (home_team, season) and (away_team, season) indexes.
+
+    :param team: the team
+    :param season: a season, all seasons by default
+    :return: ArchivedMatch queryset
+    :rtype: QuerySet
+    """
+    matches = models.ArchivedMatch.objects.filter(Q(home_team=team) | Q(away_team=team))
+    if season is not None:
+        matches = matches.filter(season=season)
+    return matches.order_by('season', *MATCH_ORDER)
+
+
+def head_to_head(team, opponent):
+    """ returns the archived matches between two teams, in playing order
+
+    :param team: a team
+    :param opponent: the other team
+    :return: ArchivedMatch queryset
+    :rtype: QuerySet
+    """
+    matches = models.ArchivedMatch.objects.filter(Q(home_team=team, away_team=opponent) |
+                                                  Q(home_team=opponent, away_team=team))
+    return matches.order_by('season', *MATCH_ORDER)
+
+
+def team_seasons(team):
+    """ returns the final table rows of a team in every archived season, oldest first
+        It reads the (team, season) index.
+
+    :param team: the team
+    :return: ArchivedStanding queryset
+    :rtype: QuerySet
+    """
+    return models.ArchivedStanding.objects.filter(team=team).order_by('season__number')
+
+
+def record_columns():
+    """ returns the aggregations of archived table rows
+        Columns are the RECORD_COLUMNS summed, the number of seasons, of
+        first places (titles) and of post season qualifications (playoffs).
+
+    :return: dict of column -> aggregation
+    :rtype: dict
+    """
+    aggregations = dict((column, Sum(column)) for column in RECORD_COLUMNS)
+    aggregations['seasons'] = Count('season', distinct=True)
+    aggregations['titles'] = Sum(Case(When(position=1, then=Value(1)), default=Value(0),
+                                      output_field=IntegerField()))
+    aggregations['playoffs'] = Sum(Case(When(playoffs=True, then=Value(1)), default=Value(0),
+                                        output_field=IntegerField()))
+    return aggregations
+
+
+def team_record(team):
+    """ returns the archived table columns of a team summed over all its seasons, in a single query
+
+    :param team: the team
+    :return: dict with the record_columns
+    :rtype: dict
+    """
+    record = models.ArchivedStanding.objects.filter(team=team).aggregate(**record_columns())
+    return dict((name, value or 0) for name, value in record.items())
+
+
+def table(group_by, **filters):
+    """ returns the archived table columns summed per group, in a single SUM / GROUP BY query
+
+    :param group_by: list of archived standing lookups to group by, e.g. ['team']
+    :param filters: archived standing filters, e.g. season__league=league
+    :return: list of dicts with the group_by lookups and the record_columns
+    :rtype: list
+    """
+    standings = models.ArchivedStanding.objects.filter(**filters)
+    return list(standings.order_by().values(*group_by).annotate(**record_columns()).order_by(*group_by))
+
+
+def division_table(**filters):
+    """ returns the archived table columns summed over the teams and seasons of every division, see table
+
+    :param filters: archived standing filters, e.g. season__league=league
+    :return: list of dicts with the division id and the record_columns
+    :rtype: list
+    """
+    return table(['division'], **filters)
+
+
+def season_table(**filters):
+    """ returns the archived table columns summed over the teams of every season, see table
+
+    :param filters: archived standing filters, e.g. season__league=league
+    :return: list of dicts with the season id and the record_columns
+    :rtype: list
+    """
+    return table(['season'], **filters)
+
+
+def goal_totals(group_by, **filters):
+    """ returns the number of archived matches and their goals per group, in a single query
+
+    :param group_by: list of archived match lookups to group by, e.g. ['season'] or ['division']
+    :param filters: archived match filters, e.g. season__league=league
+    :return: list of dicts with the group_by lookups, matches, home_goals, away_goals and goals
+    :rtype: list
+    """
+    matches = models.ArchivedMatch.objects.filter(**filters).order_by().values(*group_by)
+    matches = matches.annotate(matches=Count('id'), home_goals=Sum('home_goals'), away_goals=Sum('away_goals'))
+    totals = list(matches.order_by(*group_by))
+    for row in totals:
+        row['goals'] = row['home_goals'] + row['away_goals']
+    return totals
@@ -0,0 +1,257 @@
+import csv
+import decimal
+import io
+import json
+import uuid
+
+from django.db import transaction
+import ncl_app.models as models
+from ncl_app import bulk
+
+try:
+    import yaml
+except ImportError:
+    # YAML definitions need PyYAML
+    yaml = None
+
+FORMATS = ('json', 'yaml', 'csv')
+
+# Columns of a CSV definition, one row per team; postseason is optional
+CSV_COLUMNS = ('league', 'conference', 'division', 'team', 'strength')
+
+NAME_LENGTH = 128
+STRENGTH_PLACES = decimal.Decimal('0.0001')
+MAX_STRENGTH = decimal.Decimal('1000')
+
+
+class DefinitionError(ValueError):
+    """ Raised for an invalid league definition, lists all the problems found """
+
+    def __init__(self, errors):
+        """ initializes the error
+
+        :param errors: list of problem descriptions
+        """
+        super(DefinitionError, self).__init__('Invalid league definition:\n' + '\n'.join(errors))
+        self.errors = errors
+
+
+def parse(text, definition_format):
+    """ parses league definitions
+        JSON and YAML hold one league, a list of leagues or {"leagues": [...]},
+        a league being
+
+            {"name": "NCL", "postseason": true, "conferences": [
+                {"name": "East", "divisions": [
+                    {"name": "Atlantic", "teams": [{"name": "Boston", "strength": 1.25}, ...]}, ...]}, ...]}
+
+        CSV has one row per team with the CSV_COLUMNS and, optionally, a
+        postseason column (true/false).
+
+    :param text: the definition
+    :param definition_format: one of FORMATS
+    :return: list of league definitions
+    :rtype: list
+    """
+    try:
+        if definition_format == 'json':
+            definitions = json.loads(text)
+        elif definition_format == 'yaml':
+            if yaml is None:
+                raise DefinitionError(['YAML definitions require PyYAML'])
+            definitions = yaml.safe_load(text)
+        elif definition_format == 'csv':
+            definitions = _parse_csv(text)
+        else:
+            raise DefinitionError(['Unknown definition format: ' + str(definition_format)])
+    except DefinitionError:
+        raise
+    except Exception as e:
+        # json, yaml and csv errors
+        raise DefinitionError(['Cannot parse the definition: ' + str(e)])
+
+    if isinstance(definitions, dict) and 'leagues' in definitions:
+        definitions = definitions['leagues']
+    if isinstance(definitions, dict):
+        definitions = [definitions]
+    return definitions
+
+
+def _child(children, name, grandchildren):
+    """ returns the child with the given name, added if missing """
+    for child in children:
+        if child['name'] == name:
+            return child
+    child = {'name': name, grandchildren: []}
+    children.append(child)
+    return child
+
+
+def _parse_csv(text):
+    """ groups the team rows of a CSV definition into leagues """
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise DefinitionError(['Missing CSV column(s): ' + ', '.join(missing)])
+
+    leagues = []
+    for row in reader:
+        row = dict((column, (value or '').strip()) for column, value in row.items() if column)
+        league = _child(leagues, row['league'], 'conferences')
+        conference = _child(league['conferences'], row['conference'], 'divisions')
+        division = _child(conference['divisions'], row['division'], 'teams')
+        division['teams'].append({'name': row['team'], 'strength': row['strength']})
+        if row.get('postseason'):
+            league['postseason'] = row['postseason'].lower() in ('1', 'true', 'yes')
+
+    return leagues
+
+
+def _name(errors, path, item, siblings):
+    """ checks the name of a definition item, returns it """
+    name = item.get('name') if isinstance(item, dict) else None
+    if not isinstance(name, str) or not name.strip():
+        errors.append(path + ': missing name')
+        return None
+    name = name.strip()
+    if len(name) > NAME_LENGTH:
+        errors.append(path + ': name longer than ' + str(NAME_LENGTH) + ' characters')
+    if name in siblings:
+        errors.append(path + ': duplicate name ' + name)
+    siblings.add(name)
+    return name
+
+
+def _children(errors, path, item, key):
+    """ checks the list of children of a definition item, returns it """
+    children = item.get(key) if isinstance(item, dict) else None
+    if not isinstance(children, list) or not children:
+        errors.append(path + ': no ' + key)
+        return []
+    return children
+
+
+def validate(definitions):
+    """ checks league definitions and returns them normalized
+        Names must be given and unique among their siblings, every
+        division needs at least two teams, strengths must be positive
+        numbers that fit Team.strength. All the problems are reported at once.
+
+    :param definitions: list of league definitions, see parse
+    :return: list of league definitions with stripped names and Decimal strengths
+    :rtype: list
+    :raises DefinitionError: if a definition is invalid
+    """
+    errors = []
+    if not isinstance(definitions, list) or not definitions:
+        raise DefinitionError(['No leagues'])
+
+    leagues = []
+    league_names = set()
+    for league_idx, league in enumerate(definitions):
+        league_path = 'league ' + str(league_idx + 1)
+        name = _name(errors, league_path, league, league_names)
+        league_path = 'league ' + str(name or league_idx + 1)
+        postseason = league.get('postseason', False) if isinstance(league, dict) else False
+        if not isinstance(postseason, bool):
+            errors.append(league_path + ': postseason must be true or false')
+        conferences = []
+        conference_names = set()
+        for conference in _children(errors, league_path, league, 'conferences'):
+            conference_name = _name(errors, league_path + ' / conference', conference, conference_names)
+            conference_path = league_path + ' / ' + str(conference_name)
+            divisions = []
+            division_names = set()
+            for division in _children(errors, conference_path, conference, 'divisions'):
+                division_name = _name(errors, conference_path + ' / division', division, division_names)
+                division_path = conference_path + ' / ' + str(division_name)
+                teams = []
+                team_names = set()
+                team_list = _children(errors, division_path, division, 'teams')
+                if len(team_list) == 1:
+                    errors.append(division_path + ': at least two teams are needed')
+                for team in team_list:
+                    team_name = _name(errors, division_path + ' / team', team, team_names)
+                    try:
+                        strength = decimal.Decimal(str(team.get('strength'))).quantize(STRENGTH_PLACES)
+                        if not decimal.Decimal(0) < strength < MAX_STRENGTH:
+                            raise decimal.InvalidOperation()
+                    except (decimal.InvalidOperation, AttributeError):
+                        errors.append(division_path + ' / ' + str(team_name) + ': strength must be a number between 0 '
+                                      'and ' + str(MAX_STRENGTH))
+                        strength = None
+                    teams.append({'name': team_name, 'strength': strength})
+                divisions.append({'name': division_name, 'teams': teams})
+            conferences.append({'name': conference_name, 'divisions': divisions})
+        leagues.append({'name': name, 'postseason': postseason, 'conferences': conferences})
+
+    if errors:
+        raise DefinitionError(errors)
+    return leagues
+
+
+def _bulk_create_named(objs):
+    """ inserts new rows of a model with a name and sets their primary keys
+        Rows are inserted under placeholder names unique to this import, read
+        back by those names and renamed, so rows inserted meanwhile by
+        someone else are never taken for the new ones.
+    """
+    names = [obj.name for obj in objs]
+    placeholder = 'import:' + uuid.uuid4().hex + ':'
+    for obj_idx, obj in enumerate(objs):
+        obj.name = placeholder + str(obj_idx)
+    bulk.bulk_create(objs, type(objs[0]).objects.filter(name__startswith=placeholder))
+    for obj, name in zip(objs, names):
+        obj.name = name
+    bulk.bulk_update(objs, ['name'])
+    return objs
+
+
+def import_leagues(definitions):
+    """ creates leagues with their conferences, divisions, schedules and teams
+        Definitions are validated first, then the whole hierarchy is written
+        with one bulk insert per model inside a single transaction, leagues
+        and schedules being renamed after their insert (see
+        _bulk_create_named). Every division gets its regular season
+        schedule, named after it.
+
+    :param definitions: list of league definitions, see parse
+    :return: the new leagues
+    :rtype: list
+    :raises DefinitionError: if a definition is invalid, nothing is created
+    """
+    definitions = validate(definitions)
+    with transaction.atomic():
+        leagues = _bulk_create_named([models.League(name=league['name'], postseason=league['postseason'])
+                                      for league in definitions])
+        conference_definitions = [(league, conference) for league, definition in zip(leagues, definitions)
+                                  for conference in definition['conferences']]
+        # the new leagues only have the new conferences, and so on down
+        conferences = bulk.bulk_create([models.Conference(name=conference['name'], league=league)
+                                        for league, conference in conference_definitions],
+                                       models.Conference.objects.filter(league__in=leagues))
+        division_definitions = [(conference, division) for conference, (_, definition) in
+                                zip(conferences, conference_definitions) for division in definition['divisions']]
+        schedules = _bulk_create_named([models.Schedule(name=division['name'])
+                                        for _, division in division_definitions])
+        divisions = bulk.bulk_create([models.Division(name=division['name'], conference=conference,
+                                                      schedule=schedule)
+                                      for (conference, division), schedule in zip(division_definitions, schedules)],
+                                     models.Division.objects.filter(conference__in=conferences))
+        models.Team.objects.bulk_create([models.Team(name=team['name'], strength=team['strength'], division=division)
+                                         for division, (_, definition) in zip(divisions, division_definitions)
+                                         for team in definition['teams']])
+
+    return leagues
+
+
+def import_text(text, definition_format):
+    """ parses and imports league definitions
+
+    :param text: the definition
+    :param definition_format: one of FORMATS
+    :return: the new leagues
+    :rtype: list
+    :raises DefinitionError: if the definition is invalid, nothing is created
+    """
+    return import_leagues(parse(text, definition_format))
@@ -0,0 +1,155 @@
+import logging
+import time
+
+from django.db import close_old_connections, connection
+import ncl_app.models as models
+
+logger = logging.getLogger(__name__)
+
+# Delay before a job whose league is locked is tried again
+RETRY_SECONDS = 1
+
+
+def create_regular_season(league, day, progress):
+    """ creates the regular season of every division, once the completed season is archived """
+    league.archive_season()
+    divisions = models.Division.objects.filter(conference__league=league)
+    divisions = list(divisions.select_related('schedule', 'post_season_schedule'))
+    for done, division in enumerate(divisions):
+        progress(done, len(divisions))
+        division.create_regular_season_schedule()
+    progress(len(divisions), len(divisions))
+
+
+def play_regular_season(league, day, progress):
+    """ plays the next regular season day, unless day has already been played
+        The post season is created as soon as every division's regular season
+        is completed, divisions of fewer teams finish first.
+    """
+    if league.in_post_season or (day is not None and league.current_day >= day):
+        return
+    league.play_regular_season()
+    if league.postseason and league.schedules_completed:
+        league.create_post_season()
+
+
+def play_regular_season_to_end(league, day, progress):
+    """ plays all the remaining regular season days, unless they have already been played
+        The post season is then created.
+    """
+    if league.in_post_season or (day is not None and league.current_day >= day):
+        return
+    if not league.schedules_completed:
+        league.play_regular_season_to_end()
+    if league.postseason:
+        league.create_post_season()
+
+
+def create_post_season(league, day, progress):
+    """ creates the post season, unless it already exists """
+    if league.postseason and not league.in_post_season:
+        league.create_post_season()
+
+
+def play_post_season(league, day, progress):
+    """ plays the next post season day, unless day has already been played """
+    if day is not None and league.current_day >= day:
+        return
+    league.play_post_season()
+
+
+OPERATIONS = {
+    'create_regular_season': create_regular_season,
+    'play_regular_season': play_regular_season,
+    'play_regular_season_to_end': play_regular_season_to_end,
+    'create_post_season': create_post_season,
+    'play_post_season': play_post_season,
+}
+
+
+def perform(league, operation, day=None, progress=None):
+    """ runs a league operation while holding the league's lock
+        Operations are idempotent: given the day they expect to play, they do
+        nothing if it has already been played.
+
+    :param league: the league
+    :param operation: name of the operation, see OPERATIONS
+    :param day: day the operation expects to play, None to play anyway
+    :param progress: function called with (steps done, total steps)
+    :return: None
+    :raises LeagueLocked: if another process holds the league's lock
+    :raises ScheduleConflict: if a day has been played concurrently
+    """
+    if progress is None:
+        progress = lambda done, total: None
+    with league.lock():
+        OPERATIONS[operation](league, day, progress)
+
+
+def enqueue(league, operation, day=None):
+    """ queues a league operation
+        The same operation waiting for the same league and day is not queued
+        twice, so a retried request gets back the job of the first one.
+
+    :param league: the league
+    :param operation: name of the operation, see OPERATIONS
+    :param day: day the operation expects to play
+    :return: the job
+    :rtype: Job
+    """
+    if operation not in OPERATIONS:
+        raise ValueError('Unknown operation: ' + operation)
+    pending = models.Job.objects.filter(league=league, operation=operation, day=day,
+                                        status__in=[models.Job.QUEUED, models.Job.RUNNING])
+    job = pending.order_by('id').first()
+    if job is None:
+        job = models.Job.objects.create(league=league, operation=operation, day=day)
+
+    return job
+
+
+def run(job):
+    """ runs a claimed job and records how it ended
+        A job whose league is locked goes back to the queue.
+
+    :param job: a job claimed with Job.claim_next
+    :return: None
+    """
+    try:
+        perform(job.league, job.operation, day=job.day, progress=job.set_progress)
+    except models.LeagueLocked:
+        job.retry(RETRY_SECONDS)
+    except Exception as e:
+        logger.exception('Job %s failed', job.pk)
+        job.finish(models.Job.FAILED, error=repr(e))
+    else:
+        job.finish(models.Job.DONE)
+
+
+def work(worker, poll_interval=1.0, stop=None, drain=False):
+    """ runs jobs until stopped
+        Every worker thread uses its own database connection, closed on exit.
+
+    :param worker: name of the worker, recorded on its jobs
+    :param poll_interval: seconds to wait when the queue is empty
+    :param stop: threading.Event ending the loop once set
+    :param drain: True to return as soon as no job is queued
+    :return: number of jobs run
+    :rtype: int
+    """
+    count = 0
+    try:
+        while stop is None or not stop.is_set():
+            close_old_connections()
+            job = models.Job.claim_next(worker)
+            if job is None:
+                if drain and not models.Job.objects.filter(status=models.Job.QUEUED).exists():
+                    break
+                time.sleep(poll_interval)
+                continue
+            run(job)
+            count += 1
+    finally:
+        connection.close()
+
+    return count
@@ -0,0 +1,75 @@
+from django.db.models import F, Prefetch
+import ncl_app.models as models
+from ncl_app import caching
+
+# Lookup from a league down to its divisions
+DIVISIONS = 'conference_set__division_set'
+
+
+def league_queryset(teams=False, standings=False, days=None):
+    """ returns the leagues along with the data needed to render them
+        The whole hierarchy is loaded with a fixed number of queries, no
+        matter how many conferences, divisions, days or teams there are:
+        league.conference_set.all, conference.division_set.all,
+        division.schedule and division.post_season_schedule are always
+        available, then on request:
+        - teams: division.team_set.all
+        - standings: division.schedule.standings, the table rows best team
+          first, with their team
+        - days: division.schedule.prefetched_days, either 'all' days or
+          only the 'current' one, with day.match_set.all and the matches'
+          home_team and away_team
+
+    :param teams: True to load the divisions' teams
+    :param standings: True to load the divisions' tables
+    :param days: None, 'all' or 'current'
+    :return: a League queryset
+    :rtype: QuerySet
+    """
+    lookups = [
+        Prefetch('conference_set', queryset=models.Conference.objects.order_by('id')),
+        Prefetch(DIVISIONS, queryset=models.Division.objects.select_related('schedule', 'post_season_schedule')
+                 .order_by('id')),
+    ]
+    if teams:
+        lookups.append(Prefetch(DIVISIONS + '__team_set', queryset=models.Team.objects.order_by('id')))
+    if standings:
+        standing_queryset = models.Standing.objects.select_related('team').order_by(*models.Standing.TABLE_ORDER)
+        lookups.append(Prefetch(DIVISIONS + '__schedule__standing_set', queryset=standing_queryset,
+                                to_attr='standings'))
+    if days:
+        day_queryset = models.Day.objects.order_by('number')
+        if days == 'current':
+            day_queryset = day_queryset.filter(number=F('schedule__current_day'))
+        match_queryset = models.Match.objects.order_by('id').select_related('home_team', 'away_team')
+        lookups.append(Prefetch(DIVISIONS + '__schedule__day_set', queryset=day_queryset,
+                                to_attr='prefetched_days'))
+        lookups.append(Prefetch(DIVISIONS + '__schedule__prefetched_days__match_set', queryset=match_queryset))
+
+    return models.League.objects.order_by('id').prefetch_related(*lookups)
+
+
+def league_versions():
+    """ returns the version of every league, in display order (see League.changed)
+
+    :return: list of (league id, version, modified)
+    :rtype: list
+    """
+    return list(models.League.objects.order_by('id').values_list('pk', 'version', 'modified'))
+
+
+def cached_leagues(name, versions=None, **kwargs):
+    """ returns all the leagues as loaded by league_queryset, taken from the
+        cache for the leagues that have not changed since they were cached
+        (see caching.cached_leagues)
+
+    :param name: name of the cached data, unique for every set of kwargs
+    :param versions: result of league_versions, read when not given
+    :param kwargs: league_queryset arguments
+    :return: list of leagues
+    :rtype: list
+    """
+    if versions is None:
+        versions = league_versions()
+    return caching.cached_leagues(name, [(league_id, version) for league_id, version, _ in versions],
+                                  lambda ids: league_queryset(**kwargs).filter(pk__in=ids))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+import ncl_app.models as models
+
+
+class Command(BaseCommand):
+    """ Archives the completed seasons of one or more leagues """
+
+    help = 'Moves the completed seasons of the given leagues (all leagues by default) into the history tables'
+
+    def add_arguments(self, parser):
+        """ adds command arguments """
+        parser.add_argument('league_ids', nargs='*', type=int, help='ids of the leagues to archive')
+        parser.add_argument('--chunk-size', type=int, dest='chunk_size', default=models.League.ARCHIVE_CHUNK_SIZE,
+                            help='number of matches read per query')
+
+    def handle(self, *args, **options):
+        """ handles the command """
+        leagues = models.League.objects.all()
+        if options['league_ids']:
+            leagues = leagues.filter(pk__in=options['league_ids'])
+            missing = set(options['league_ids']) - set(league.pk for league in leagues)
+            if missing:
+                raise CommandError('League(s) not found: ' + ', '.join(str(pk) for pk in sorted(missing)))
+
+        for league in leagues:
+            try:
+                with league.lock():
+                    season = league.archive_season(chunk_size=options['chunk_size'])
+            except models.LeagueLocked as e:
+                self.stderr.write(str(e) + ', skipped')
+                continue
+            if season is None:
+                self.stdout.write('Season of ' + league.name + ' is not completed')
+            else:
+                self.stdout.write(str(season) + ' archived')
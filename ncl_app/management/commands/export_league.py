@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+import ncl_app.models as models
+from ncl_app import export
+
+
+class Command(BaseCommand):
+    """ Exports the archived seasons, days, matches and series of a league """
+
+    help = 'Exports the archived seasons and every day, match, match part and series of a league as CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        """ adds command arguments """
+        parser.add_argument('league_id', type=int, help='id of the league to export')
+        parser.add_argument('--format', dest='format', choices=export.FORMATS, default='csv',
+                            help='export format')
+        parser.add_argument('--output', dest='output', default=None,
+                            help='file to write, the standard output by default')
+        parser.add_argument('--chunk-size', type=int, dest='chunk_size', default=export.CHUNK_SIZE,
+                            help='number of rows read per query')
+
+    def handle(self, *args, **options):
+        """ handles the command """
+        try:
+            league = models.League.objects.get(pk=options['league_id'])
+        except models.League.DoesNotExist:
+            raise CommandError('League not found: ' + str(options['league_id']))
+
+        lines = export.export_lines(league, options['format'], chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(lines)
+        else:
+            self.stdout.ending = ''
+            for line in lines:
+                self.stdout.write(line)
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+import ncl_app.models as models
+from ncl_app import montecarlo, round_robin
+
+
+class Command(BaseCommand):
+    """ Forecasts the playoff odds of a league's teams """
+
+    help = 'Forecasts the playoff odds of a league by simulating the rest of its regular season many times'
+
+    def add_arguments(self, parser):
+        """ adds command arguments """
+        parser.add_argument('league_id', type=int, help='id of the league to forecast')
+        parser.add_argument('--seasons', type=int, dest='seasons', default=10000,
+                            help='number of simulated seasons')
+        parser.add_argument('--workers', type=int, dest='workers', default=None,
+                            help='number of worker processes, one per CPU by default')
+        parser.add_argument('--seed', type=int, dest='seed', default=None,
+                            help='master seed, the same seed gives the same forecast for any number of workers')
+
+    def handle(self, *args, **options):
+        """ handles the command """
+        try:
+            league = models.League.objects.get(pk=options['league_id'])
+        except models.League.DoesNotExist:
+            raise CommandError('League not found: ' + str(options['league_id']))
+        divisions = models.Division.objects.filter(conference__league=league).select_related('schedule')
+
+        for division in divisions.order_by('conference', 'id'):
+            teams = list(division.team_set.all())
+            team_idx = dict((team.pk, idx) for idx, team in enumerate(teams))
+            # the matches still to be played, a whole season if none was created yet
+            matches = models.Match.objects.filter(day__schedule=division.schedule, outcome__isnull=True)
+            fixture_list = [(day_number, team_idx[home_team_id], team_idx[away_team_id]) for
+                            day_number, home_team_id, away_team_id in
+                            matches.values_list('day__number', 'home_team_id', 'away_team_id')]
+            initial_points = [team.points for team in teams]
+            if not division.schedule.day_set.exists():
+                fixture_list = round_robin.fixtures(len(teams))
+                initial_points = None
+
+            forecast = montecarlo.run_forecast([float(team.strength) for team in teams], fixture_list=fixture_list,
+                                               seasons=options['seasons'], seed=options['seed'],
+                                               workers=options['workers'], initial_points=initial_points)
+
+            self.stdout.write(division.name)
+            ranking = sorted(zip(teams, forecast.expected_points(), forecast.playoff_odds()),
+                             key=lambda entry: entry[2], reverse=True)
+            for team, expected_points, playoff_odds in ranking:
+                self.stdout.write('    {:<32} {:6.1f} pts {:6.1%} playoffs'.format(team.name, expected_points,
+                                                                                   playoff_odds))
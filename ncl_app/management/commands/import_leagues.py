@@ -0,0 +1,39 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from ncl_app import importer
+
+
+class Command(BaseCommand):
+    """ Creates leagues from definition files """
+
+    help = 'Creates leagues, with their conferences, divisions, schedules and teams, from JSON, YAML or CSV files'
+
+    def add_arguments(self, parser):
+        """ adds command arguments """
+        parser.add_argument('files', nargs='+', help='league definition files')
+        parser.add_argument('--format', dest='format', choices=importer.FORMATS, default=None,
+                            help='format of the files, from their extension by default')
+
+    def handle(self, *args, **options):
+        """ handles the command """
+        definitions = []
+        for path in options['files']:
+            definition_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+            if definition_format == 'yml':
+                definition_format = 'yaml'
+            if definition_format not in importer.FORMATS:
+                raise CommandError('Unknown format of ' + path + ', use --format')
+            try:
+                with open(path, newline='') as definition:
+                    definitions.extend(importer.parse(definition.read(), definition_format))
+            except (IOError, importer.DefinitionError) as e:
+                raise CommandError(path + ': ' + str(e))
+
+        # all the files are imported together, or none of them
+        try:
+            leagues = importer.import_leagues(definitions)
+        except importer.DefinitionError as e:
+            raise CommandError(str(e))
+        for league in leagues:
+            self.stdout.write('League ' + league.name + ' created (id ' + str(league.pk) + ')')
@@ -0,0 +1,39 @@
+import concurrent.futures
+import os
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from ncl_app import jobs
+
+
+class Command(BaseCommand):
+    """ Runs the queued background jobs """
+
+    help = 'Runs the queued league operations (season creation, play) with a pool of worker threads'
+
+    def add_arguments(self, parser):
+        """ adds command arguments """
+        parser.add_argument('--threads', type=int, dest='threads', default=4,
+                            help='number of worker threads, jobs of different leagues run in parallel')
+        parser.add_argument('--poll', type=float, dest='poll', default=1.0,
+                            help='seconds to wait when the queue is empty')
+        parser.add_argument('--drain', action='store_true', dest='drain', default=False,
+                            help='exit once the queue is empty instead of waiting for new jobs')
+
+    def handle(self, *args, **options):
+        """ handles the command """
+        name = socket.gethostname() + ':' + str(os.getpid())
+        stop = threading.Event()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            workers = [executor.submit(jobs.work, name + ':' + str(idx), poll_interval=options['poll'], stop=stop,
+                                       drain=options['drain'])
+                       for idx in range(options['threads'])]
+            try:
+                count = sum(worker.result() for worker in workers)
+            except KeyboardInterrupt:
+                # running jobs are completed before exiting
+                stop.set()
+                count = sum(worker.result() for worker in workers)
+
+        self.stdout.write(str(count) + ' job(s) run')
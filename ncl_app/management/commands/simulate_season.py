@@ -0,0 +1,39 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+import ncl_app.models as models
+
+
+class Command(BaseCommand):
+    """ Plays all the remaining regular season days of one or more leagues """
+
+    help = 'Plays all the remaining regular season days of the given leagues (all leagues by default)'
+
+    def add_arguments(self, parser):
+        """ adds command arguments """
+        parser.add_argument('league_ids', nargs='*', type=int, help='ids of the leagues to simulate')
+        parser.add_argument('--create', action='store_true', dest='create', default=False,
+                            help='create a new regular season before playing it')
+        parser.add_argument('--seed', type=int, dest='seed', default=None,
+                            help='seed of the random generator, to reproduce a season')
+
+    def handle(self, *args, **options):
+        """ handles the command """
+        leagues = models.League.objects.all()
+        if options['league_ids']:
+            leagues = leagues.filter(pk__in=options['league_ids'])
+            missing = set(options['league_ids']) - set(league.pk for league in leagues)
+            if missing:
+                raise CommandError('League(s) not found: ' + ', '.join(str(pk) for pk in sorted(missing)))
+
+        rng = random.Random(options['seed'])
+        for league in leagues:
+            try:
+                with league.lock():
+                    if options['create']:
+                        league.create_regular_season()
+                    league.play_regular_season_to_end(rng=rng)
+            except (models.LeagueLocked, models.ScheduleConflict) as e:
+                self.stderr.write(str(e) + ', skipped')
+                continue
+            self.stdout.write('Regular season of ' + league.name + ' completed')
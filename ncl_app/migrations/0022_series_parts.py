@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 07:48
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# model changes of the post season engine (SeriesPart, Series fields, Team.playoffs) that no migration had
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0021_league_postseason'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeriesPart',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lead', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='match',
+            name='series',
+        ),
+        migrations.RemoveField(
+            model_name='series',
+            name='loser',
+        ),
+        migrations.RemoveField(
+            model_name='series',
+            name='name',
+        ),
+        migrations.RemoveField(
+            model_name='series',
+            name='winner',
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='length',
+            field=models.IntegerField(default=3),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='matches',
+            field=models.ManyToManyField(to='ncl_app.Match'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='schedule',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Schedule'),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='playoffs',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='seriespart',
+            name='series',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Series'),
+        ),
+        migrations.AddField(
+            model_name='seriespart',
+            name='team',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Team'),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='teams',
+            field=models.ManyToManyField(through='ncl_app.SeriesPart', to='ncl_app.Team'),
+        ),
+    ]
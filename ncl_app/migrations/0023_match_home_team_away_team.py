@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 07:48
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0022_series_parts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='away_team',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='away_matches', to='ncl_app.Team'),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='home_team',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='home_matches', to='ncl_app.Team'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+BACKFILL_SQL = """
+UPDATE ncl_app_match
+SET home_team_id = (SELECT team_id FROM ncl_app_matchpart
+                    WHERE ncl_app_matchpart.match_id = ncl_app_match.id AND location = 'home'),
+    away_team_id = (SELECT team_id FROM ncl_app_matchpart
+                    WHERE ncl_app_matchpart.match_id = ncl_app_match.id AND location = 'away')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0023_match_home_team_away_team'),
+    ]
+
+    operations = [
+        # copy the teams of the existing match parts on their matches
+        migrations.RunSQL([BACKFILL_SQL], reverse_sql=migrations.RunSQL.noop),
+    ]
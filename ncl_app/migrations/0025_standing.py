@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 07:50
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0024_backfill_match_teams'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('goals_for', models.IntegerField(default=0)),
+                ('goals_against', models.IntegerField(default=0)),
+                ('goal_difference', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Schedule')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Team')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='standing',
+            unique_together=set([('schedule', 'team')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='standing',
+            index_together=set([('schedule', 'points', 'goal_difference', 'goals_for')]),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+def build_standings(apps, schema_editor):
+    """ builds the standings of the existing schedules from their played matches """
+    Match = apps.get_model('ncl_app', 'Match')
+    Standing = apps.get_model('ncl_app', 'Standing')
+    Team = apps.get_model('ncl_app', 'Team')
+
+    tables = {}
+    for team_id, schedule_id in Team.objects.values_list('id', 'division__schedule_id'):
+        tables.setdefault(schedule_id, {})[team_id] = Standing(schedule_id=schedule_id, team_id=team_id)
+
+    matches = Match.objects.filter(outcome__isnull=False).values_list('day__schedule_id', 'home_team_id',
+                                                                      'away_team_id', 'outcome', 'score')
+    for schedule_id, home_team_id, away_team_id, outcome, score in matches:
+        table = tables.get(schedule_id, {})
+        if home_team_id not in table or away_team_id not in table:
+            continue
+        home_goals, away_goals = [int(goals) for goals in score.split('-')]
+        for team_id, goals_for, goals_against, result in ((home_team_id, home_goals, away_goals, '1'),
+                                                          (away_team_id, away_goals, home_goals, '2')):
+            standing = table[team_id]
+            standing.played += 1
+            standing.goals_for += goals_for
+            standing.goals_against += goals_against
+            standing.goal_difference += goals_for - goals_against
+            if outcome == 'X':
+                standing.draws += 1
+                standing.points += 1
+            elif outcome == result:
+                standing.wins += 1
+                standing.points += 3
+            else:
+                standing.losses += 1
+
+    Standing.objects.bulk_create([standing for table in tables.values() for standing in table.values()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0025_standing'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_standings, migrations.RunPython.noop),
+    ]
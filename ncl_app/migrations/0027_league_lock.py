@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 07:53
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0026_backfill_standings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='league',
+            name='lock_expires',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='league',
+            name='lock_token',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
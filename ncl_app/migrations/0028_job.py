@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 07:54
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0027_league_lock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation', models.CharField(choices=[('create_regular_season', 'create regular season'), ('play_regular_season', 'play regular season day'), ('play_regular_season_to_end', 'play regular season to end'), ('create_post_season', 'create post season'), ('play_post_season', 'play post season day')], max_length=32)),
+                ('day', models.IntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('queued', 'queued'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], default='queued', max_length=8)),
+                ('progress', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('worker', models.CharField(blank=True, default='', max_length=128)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('not_before', models.DateTimeField(blank=True, null=True)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ncl_app.League')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='job',
+            index_together=set([('status', 'id')]),
+        ),
+    ]
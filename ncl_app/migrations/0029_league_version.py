@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 07:57
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0028_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='league',
+            name='modified',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='league',
+            name='version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 08:01
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0029_league_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='away_goals',
+            field=models.IntegerField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='home_goals',
+            field=models.IntegerField(db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+def backfill_goals(apps, schema_editor):
+    """ sets the goals of the played matches from their score, one update per distinct score """
+    Match = apps.get_model('ncl_app', 'Match')
+
+    played = Match.objects.filter(outcome__isnull=False)
+    for score in played.order_by().values_list('score', flat=True).distinct():
+        home_goals, away_goals = [int(goals) for goals in score.split('-')]
+        played.filter(score=score).update(home_goals=home_goals, away_goals=away_goals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0030_match_goals'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_goals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 08:02
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0031_backfill_match_goals'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='day',
+            unique_together=set([('schedule', 'number')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='matchpart',
+            unique_together=set([('match', 'location')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='seriespart',
+            unique_together=set([('series', 'lead')]),
+        ),
+    ]
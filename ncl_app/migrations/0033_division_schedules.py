@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 08:05
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def split_schedules(apps, schema_editor):
+    """ gives every division a schedule of its own and moves post seasons to their own schedule
+        A schedule shared by several divisions stays with the division of
+        its name, as Schedule.get_division used to find it. A schedule holding
+        series was reset for the post season, it becomes the division's post
+        season schedule and a completed regular season schedule takes its place.
+    """
+    Division = apps.get_model('ncl_app', 'Division')
+    Schedule = apps.get_model('ncl_app', 'Schedule')
+    Series = apps.get_model('ncl_app', 'Series')
+
+    post_season_ids = set(Series.objects.values_list('schedule_id', flat=True))
+    kept_ids = set()
+    for division in Division.objects.select_related('schedule').order_by('id'):
+        schedule = division.schedule
+        owner = Division.objects.filter(schedule=schedule, name=schedule.name).order_by('id').first() or division
+        if schedule.pk in kept_ids or owner.pk != division.pk:
+            division.schedule = Schedule.objects.create(name=division.name)
+        else:
+            kept_ids.add(schedule.pk)
+            if schedule.pk in post_season_ids:
+                division.post_season_schedule = schedule
+                division.schedule = Schedule.objects.create(name=division.name, completed=True)
+                # cut to fit the 128 characters of Schedule.name
+                Schedule.objects.filter(pk=schedule.pk).update(name=division.name[0:116] + ' Post Season')
+        division.save()
+
+
+def delete_legacy_series(apps, schema_editor):
+    """ deletes what is left of the series created by the first post season code
+        Series games were created up front, unplayed, with the series; they
+        are now only written when played (see Schedule.play_post_season_days),
+        so the unplayed ones go with their parts, the series are kept.
+        Series of the model before 0022_series_parts lost their teams there,
+        they cannot be played and go too.
+    """
+    Match = apps.get_model('ncl_app', 'Match')
+    Series = apps.get_model('ncl_app', 'Series')
+    Match.objects.filter(series__isnull=False, outcome__isnull=True).delete()
+    Series.objects.filter(seriespart__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0032_schedule_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='division',
+            name='post_season_schedule',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='post_season_division', to='ncl_app.Schedule'),
+        ),
+        migrations.RunPython(split_schedules, migrations.RunPython.noop),
+        migrations.RunPython(delete_legacy_series, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 08:06
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# apart from 0033_division_schedules: PostgreSQL cannot alter a table written earlier in the same transaction
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0033_division_schedules'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='division',
+            name='schedule',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='division', to='ncl_app.Schedule'),
+        ),
+    ]
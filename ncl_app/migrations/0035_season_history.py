@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.3 on 2026-10-18 08:09
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ncl_app', '0034_division_schedule_one_to_one'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMatch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('R', 'regular season'), ('P', 'post season')], max_length=1)),
+                ('day', models.SmallIntegerField()),
+                ('home_goals', models.SmallIntegerField()),
+                ('away_goals', models.SmallIntegerField()),
+                ('outcome', models.CharField(choices=[('X', 'draw'), ('1', 'home'), ('2', 'away')], max_length=1)),
+                ('away_team', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_away_matches', to='ncl_app.Team')),
+                ('division', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Division')),
+                ('home_team', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_home_matches', to='ncl_app.Team')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedStanding',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.SmallIntegerField()),
+                ('playoffs', models.BooleanField(default=False)),
+                ('played', models.SmallIntegerField(default=0)),
+                ('wins', models.SmallIntegerField(default=0)),
+                ('draws', models.SmallIntegerField(default=0)),
+                ('losses', models.SmallIntegerField(default=0)),
+                ('goals_for', models.SmallIntegerField(default=0)),
+                ('goals_against', models.SmallIntegerField(default=0)),
+                ('points', models.SmallIntegerField(default=0)),
+                ('division', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Division')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Season',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.IntegerField()),
+                ('archived', models.DateTimeField(default=django.utils.timezone.now)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='ncl_app.League')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedstanding',
+            name='season',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Season'),
+        ),
+        migrations.AddField(
+            model_name='archivedstanding',
+            name='team',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Team'),
+        ),
+        migrations.AddField(
+            model_name='archivedmatch',
+            name='season',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='ncl_app.Season'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='season',
+            unique_together=set([('league', 'number')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedstanding',
+            unique_together=set([('season', 'team')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='archivedstanding',
+            index_together=set([('team', 'season')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='archivedmatch',
+            index_together=set([('home_team', 'season'), ('away_team', 'season'), ('season', 'stage', 'day')]),
+        ),
+    ]
@@ -1,25 +1,205 @@
-import random
-from django.db import models
+import contextlib
+import datetime
+import itertools
+import uuid
+
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from ncl_app import bulk, round_robin, scores, simulation
 
 # Create your models here.
 
 
+class ScheduleConflict(Exception):
+    """ Raised when a schedule's day has already been played by a concurrent request """
+    pass
+
+
+class LeagueLocked(Exception):
+    """ Raised when another process holds a league's simulation lock """
+    pass
+
+
 class League(models.Model):
     """ Implements a League object """
 
     # Class variables
+    LOCK_SECONDS = 300
+    ARCHIVE_CHUNK_SIZE = 2000
     name = models.CharField(max_length=128)
     postseason = models.BooleanField(default=False)
+    lock_token = models.CharField(max_length=32, blank=True, default='')
+    lock_expires = models.DateTimeField(null=True, blank=True)
+    # changed together by every state mutation, see changed()
+    version = models.IntegerField(default=0)
+    modified = models.DateTimeField(default=timezone.now)
+
+    # written by conditional updates only, see lock and changed
+    STATE_FIELDS = ('lock_token', 'lock_expires', 'version', 'modified')
 
     def __str__(self):
         """ __str__ overwrite """
         return self.name
 
+    def save(self, *args, **kwargs):
+        """ save overwrite
+            An existing league's STATE_FIELDS are left out, so saving a stale
+            instance, e.g. in the admin, neither moves its version back nor
+            releases another process' lock.
+        """
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in League.STATE_FIELDS]
+        super(League, self).save(*args, **kwargs)
+
+    @contextlib.contextmanager
+    def lock(self, seconds=LOCK_SECONDS):
+        """ holds the league's simulation lock while the block runs
+            The lock is a lease written on the league's row with a conditional
+            update, it is taken only if it is free or expired, so it works the
+            same on SQLite and on server databases and across processes. The
+            lease expires by itself if its holder dies.
+
+        :param seconds: duration of the lease
+        :return: context manager
+        :raises LeagueLocked: if another process holds the lock
+        """
+        token = uuid.uuid4().hex
+        now = timezone.now()
+        free = models.Q(lock_expires__isnull=True) | models.Q(lock_expires__lt=now)
+        if not League.objects.filter(free, pk=self.pk).update(
+                lock_token=token, lock_expires=now + datetime.timedelta(seconds=seconds)):
+            raise LeagueLocked('League ' + self.name + ' is being simulated')
+        try:
+            yield
+        finally:
+            League.objects.filter(pk=self.pk, lock_token=token).update(lock_token='', lock_expires=None)
+
+    @staticmethod
+    def changed(*conditions, **lookup):
+        """ stamps the leagues matching lookup with a new version
+            The version is part of the key of everything cached about a league
+            and of the ETag of the pages showing it. It is written in the
+            transaction of the change, so a version is never seen before its
+            change.
+
+        :param conditions: League queryset Q objects
+        :param lookup: League queryset filter, e.g. conference__division__team=team
+        :return: None
+        """
+        League.objects.filter(*conditions, **lookup).update(version=models.F('version') + 1, modified=timezone.now())
+
+    @staticmethod
+    def schedules_changed(schedule_ids):
+        """ stamps the leagues of regular or post season schedules with a new version, see changed
+
+        :param schedule_ids: ids of the schedules
+        :return: None
+        """
+        League.changed(models.Q(conference__division__schedule__in=schedule_ids) |
+                       models.Q(conference__division__post_season_schedule__in=schedule_ids))
+
+    @property
+    def schedules(self):
+        """ returns the league's regular and post season schedules """
+        return Schedule.objects.filter(models.Q(division__conference__league=self) |
+                                       models.Q(post_season_division__conference__league=self))
+
+    @property
+    def current_day(self):
+        """ returns the last day played by the league's current schedules, see Division.current_schedule """
+        return max([division.current_schedule.current_day for conference in self.conference_set.all()
+                    for division in conference.division_set.all()] or [0])
+
+    @property
+    def in_post_season(self):
+        """ returns True once the post season has been created """
+        return Series.objects.filter(schedule__post_season_division__conference__league=self).exists()
+
+    @property
+    def schedules_completed(self):
+        """ returns True if all the league's current schedules are completed, see Division.current_schedule """
+        running = (models.Q(post_season_schedule__isnull=True, schedule__completed=False) |
+                   models.Q(post_season_schedule__completed=False))
+        return not Division.objects.filter(running, conference__league=self).exists()
+
+    @property
+    def season_completed(self):
+        """ returns True once the season has been played, including the post season of leagues having one """
+        if not Day.objects.filter(schedule__in=self.schedules).exists():
+            return False
+        if self.postseason and not self.in_post_season:
+            return False
+        return self.schedules_completed
+
+    def archive_season(self, chunk_size=ARCHIVE_CHUNK_SIZE):
+        """ moves the league's completed season into the history tables
+            The played matches and the final tables are copied to a new
+            season's ArchivedMatch and ArchivedStanding rows, matches being
+            read chunk_size at a time, then the live tables are cleared (see
+            Division.reset_seasons), all inside a single transaction. The
+            live tables only ever hold the current season, however many
+            seasons are kept.
+
+        :param chunk_size: number of matches read per query
+        :return: the new season, None if the season is not completed
+        :rtype: Season
+        """
+        if not self.season_completed:
+            return None
+        divisions = list(Division.objects.filter(conference__league=self).select_related('schedule',
+                                                                                        'post_season_schedule'))
+        # schedule id -> (division id, stage)
+        stages = {}
+        for division in divisions:
+            stages[division.schedule_id] = (division.pk, ArchivedMatch.REGULAR_SEASON)
+            if division.post_season_schedule_id is not None:
+                stages[division.post_season_schedule_id] = (division.pk, ArchivedMatch.POST_SEASON)
+
+        with transaction.atomic():
+            last_number = self.season_set.aggregate(last_number=models.Max('number'))['last_number'] or 0
+            season = Season.objects.create(league=self, number=last_number + 1)
+
+            matches = Match.objects.filter(day__schedule__in=list(stages), outcome__isnull=False).order_by('pk')
+            last_pk = 0
+            while True:
+                chunk = list(matches.filter(pk__gt=last_pk).values_list(
+                    'pk', 'day__schedule_id', 'day__number', 'home_team_id', 'away_team_id', 'home_goals',
+                    'away_goals', 'outcome')[0:chunk_size])
+                if not chunk:
+                    break
+                ArchivedMatch.objects.bulk_create([
+                    ArchivedMatch(season=season, division_id=stages[schedule_id][0], stage=stages[schedule_id][1],
+                                  day=day, home_team_id=home_team_id, away_team_id=away_team_id,
+                                  home_goals=home_goals, away_goals=away_goals, outcome=outcome)
+                    for _, schedule_id, day, home_team_id, away_team_id, home_goals, away_goals, outcome in chunk])
+                last_pk = chunk[-1][0]
+
+            standings = Standing.objects.filter(schedule__in=[division.schedule_id for division in divisions])
+            standings = standings.order_by('schedule', *Standing.TABLE_ORDER)
+            columns = ('played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against', 'points')
+            positions = {}
+            archived_standings = []
+            for row in standings.values_list('schedule_id', 'team_id', 'team__playoffs', *columns):
+                schedule_id, team_id, playoffs = row[0:3]
+                positions[schedule_id] = positions.get(schedule_id, 0) + 1
+                archived_standings.append(ArchivedStanding(season=season, division_id=stages[schedule_id][0],
+                                                           team_id=team_id, position=positions[schedule_id],
+                                                           playoffs=playoffs, **dict(zip(columns, row[3:]))))
+            ArchivedStanding.objects.bulk_create(archived_standings)
+
+            Division.reset_seasons(divisions)
+
+        return season
+
     def create_regular_season(self):
         """ creates regular season by calling conferences method
+            A completed season is archived first, see archive_season
 
         :return: None
         """
+        self.archive_season()
         for conference in self.conference_set.all():
             conference.create_regular_season()
 
@@ -31,25 +211,43 @@ class League(models.Model):
         for conference in self.conference_set.all():
             conference.create_post_season()
 
-    def play_regular_season(self):
-        """ plays regular season by calling conferences method
+    def play_regular_season(self, rng=None):
+        """ plays the next regular season day of all the league's divisions
+            in one batch
 
-        :return: True or False if completed
+        :param rng: random.Random instance, the global random generator by default
+        :return: True once every division's regular season is completed
         :rtype: bool
         """
-        completed = False
-        for conference in self.conference_set.all():
-            completed = conference.play_regular_season() or completed
+        divisions = list(Division.objects.filter(conference__league=self).select_related('schedule'))
+        Division.play_regular_season_schedules(divisions, rng=rng)
+        # divisions of fewer teams finish first
+        return all(division.schedule.completed for division in divisions)
+
+    def play_regular_season_to_end(self, rng=None):
+        """ plays all the remaining regular season days of all the league's
+            divisions in one batch
 
-        return completed
+        :param rng: random.Random instance, the global random generator by default
+        :return: None
+        """
+        divisions = Division.objects.filter(conference__league=self).select_related('schedule')
+        Division.play_regular_season_schedules_to_end(divisions, rng=rng)
 
-    def play_post_season(self):
-        """ plays post season by calling conferences method
+    def play_post_season(self, rng=None):
+        """ plays the next post season day of all the league's divisions
+            in one batch
 
+        :param rng: random.Random instance, the global random generator by default
         :return: True or False if completed
         :rtype: bool
         """
-        pass
+        schedules = [division.post_season_schedule for division in
+                     Division.objects.filter(conference__league=self, post_season_schedule__isnull=False)
+                     .select_related('post_season_schedule')]
+        Schedule.play_post_season_days(schedules, rng=rng)
+
+        return all(schedule.completed for schedule in schedules)
 
 
 class Conference(models.Model):
@@ -80,16 +278,15 @@ class Conference(models.Model):
             division.create_post_season_schedule()
 
     def play_regular_season(self):
-        """ plays regular season by calling division method
+        """ plays the next regular season day of all the conference's
+            divisions in one batch
 
-        :return: True or False if completed
+        :return: True once every division's regular season is completed
         :rtype: bool
         """
-        completed = False
-        for division in self.division_set.all():
-            completed = division.play_regular_season_schedule() or completed
-
-        return completed
+        divisions = list(self.division_set.select_related('schedule'))
+        Division.play_regular_season_schedules(divisions)
+        return all(division.schedule.completed for division in divisions)
 
 
 class Schedule(models.Model):
@@ -116,197 +313,372 @@ class Schedule(models.Model):
 
     @property
     def get_division(self):
-        """ returns division """
-        return self.division_set.get(name=self.name)
+        """ returns the division the schedule belongs to, as its regular or post season schedule
+            The division is read through the one-to-one relations, so it is
+            already there when the schedule was loaded with
+            select_related('division', 'post_season_division').
+
+        :return: division or None
+        :rtype: Division
+        """
+        for relation in ('division', 'post_season_division'):
+            try:
+                return getattr(self, relation)
+            except Division.DoesNotExist:
+                pass
+        return None
 
     def reset(self):
         """ resets schedule """
-        self.current_day = 0
-        self.completed = False
-        self.save()
-        self.day_set.all().delete()
-        self.series_set.all().delete()
+        Schedule.reset_schedules([self])
+
+    @staticmethod
+    def clear_schedules(schedule_ids):
+        """ deletes the days, matches, series and standings of many schedules
+            The tree is deleted with one set-based DELETE per table, children
+            first (see bulk.bulk_delete), no row is loaded in memory.
+
+        :param schedule_ids: ids of the schedules
+        :return: None
+        """
+        with transaction.atomic():
+            series_matches = Series.matches.through.objects.filter(
+                models.Q(series__schedule__in=schedule_ids) | models.Q(match__day__schedule__in=schedule_ids))
+            bulk.bulk_delete(series_matches,
+                             SeriesPart.objects.filter(series__schedule__in=schedule_ids),
+                             Series.objects.filter(schedule__in=schedule_ids),
+                             MatchPart.objects.filter(match__day__schedule__in=schedule_ids),
+                             Match.objects.filter(day__schedule__in=schedule_ids),
+                             Day.objects.filter(schedule__in=schedule_ids),
+                             Standing.objects.filter(schedule__in=schedule_ids))
+
+    @staticmethod
+    def reset_schedules(schedules):
+        """ resets many schedules in one transaction, see clear_schedules
+
+        :param schedules: list of schedules
+        :return: None
+        """
+        schedule_ids = [schedule.pk for schedule in schedules]
+        if not schedule_ids:
+            return
+        with transaction.atomic():
+            Schedule.clear_schedules(schedule_ids)
+            Schedule.objects.filter(pk__in=schedule_ids).update(current_day=0, completed=False)
+            League.schedules_changed(schedule_ids)
+        for schedule in schedules:
+            schedule.current_day = 0
+            schedule.completed = False
+
+    @property
+    def sorted_standing_set(self):
+        """ returns the table, best team first """
+        return self.standing_set.select_related('team').order_by(*Standing.TABLE_ORDER)
+
+    def rebuild_standings(self):
+        """ rebuilds the table from the outcome and score of the played matches
 
-    def create_regular_season(self, team_list):
+        :return: None
+        """
+        table = dict((team_id, dict((column, 0) for column in simulation.TABLE_COLUMNS))
+                     for team_id in self.standing_set.values_list('team_id', flat=True))
+        matches = Match.objects.filter(day__schedule=self, outcome__isnull=False)
+        for home_team_id, away_team_id, outcome, score in matches.values_list('home_team_id', 'away_team_id',
+                                                                               'outcome', 'score'):
+            home_row, away_row = simulation.table_rows(outcome, score)
+            simulation.add_to_table(table, home_team_id, home_row)
+            simulation.add_to_table(table, away_team_id, away_row)
+
+        with transaction.atomic():
+            self.standing_set.all().delete()
+            Standing.objects.bulk_create([Standing(schedule=self, team_id=team_id, **row)
+                                          for team_id, row in table.items()])
+            League.schedules_changed([self.pk])
+
+    def create_regular_season(self, team_list, legs=2):
         """ creates a regular season schedule
-            It first arranges all the division's team into a rotating table
-            that is used to create a round robin schedule.
-            It then rolls through the number of days that would make a round
-            robin schedule and creates one day for the first part of the season
-            and the associated day for the second half of the season (i.e.
-            home and away teams are swapped)
-            It uses the rotating table to fill out matches accordingly.
+            The round robin fixture list is computed in memory by the
+            round_robin module, by default with two legs: one day for the
+            first part of the season and the associated day for the second
+            half of the season (i.e. home and away teams are swapped).
+            The schedule is then written with one bulk insert per model inside
+            a single transaction.
 
         :param team_list: List of teams
+        :param legs: number of times every team meets every other team
         :return: None
         """
 
-        rotating_table = {}
-        for team_idx in range(0, len(team_list)):
-            rotating_table[team_idx + 1] = team_list[team_idx]
-            team_idx += 1
-        day_number = 1
-
-        swapping = False
-        while day_number <= len(team_list) - 1:
-            # Create a new day, first half of the season
-            first_half_day = Day(number=day_number, schedule=self)
-            first_half_day.save()
-            # Create a new day, second half of the season
-            second_half_day_number = day_number + len(team_list) - 1
-            second_half_day = Day(number=second_half_day_number, schedule=self)
-            second_half_day.save()
-            # Find teams and create Matches
-            match_idx = 1
-            while match_idx <= len(team_list) // 2:
-                if match_idx == 1:
-                    if swapping:
-                        team1 = rotating_table[match_idx + 1]
-                        team2 = rotating_table[match_idx]
-                    else:
-                        team1 = rotating_table[match_idx]
-                        team2 = rotating_table[match_idx + 1]
-                else:
-                    team1 = rotating_table[match_idx + 1]
-                    team2 = rotating_table[len(team_list) - match_idx + 2]
-                # first half of the season
-                first_half_match = Match(day=first_half_day)
-                first_half_match.save()
-                first_half_match_home_team_part = MatchPart(team=team1, match=first_half_match, location='home')
-                first_half_match_home_team_part.save()
-                first_half_match_away_team_part = MatchPart(team=team2, match=first_half_match, location='away')
-                first_half_match_away_team_part.save()
-                # second half of the season
-                second_half_match = Match(day=second_half_day)
-                second_half_match.save()
-                second_half_match_home_team_part = MatchPart(team=team2, match=second_half_match, location='home')
-                second_half_match_home_team_part.save()
-                second_half_match_away_team_part = MatchPart(team=team1, match=second_half_match, location='away')
-                second_half_match_away_team_part.save()
-                match_idx += 1
-            day_number += 1
-            swapping = not swapping
-            # rotate table
-            curr_val = 0
-            for entry in rotating_table.keys():
-                if entry == 2:
-                    curr_val = rotating_table[entry]
-                    rotating_table[entry] = rotating_table[len(team_list)]
-                elif entry > 2:
-                    stored_val = rotating_table[entry]
-                    rotating_table[entry] = curr_val
-                    curr_val = stored_val
+        team_list = list(team_list)
+        fixtures = [(day_number, team_list[home_idx], team_list[away_idx])
+                    for day_number, home_idx, away_idx in round_robin.fixtures(len(team_list), legs)]
+
+        with transaction.atomic():
+            day_numbers = sorted(set(fixture[0] for fixture in fixtures))
+            Day.objects.bulk_create([Day(number=number, schedule=self) for number in day_numbers])
+            day_ids = dict(self.day_set.values_list('number', 'id'))
+            matches = [Match(day_id=day_ids[day_number], home_team=home_team, away_team=away_team)
+                       for day_number, home_team, away_team in fixtures]
+            bulk.bulk_create(matches, Match.objects.filter(day__schedule=self))
+            MatchPart.objects.bulk_create(MatchPart.for_matches(matches))
+            Standing.objects.bulk_create([Standing(schedule=self, team=team) for team in team_list])
+            League.schedules_changed([self.pk])
 
     def create_post_season_series(self, team_list):
         """ creates a playoffs/playouts schedule
             Teams are arranged such that the best team plays against the worst team as per
             regular season results.
-            Series are created for team pairs in team list, then schedules are created per series
+            Series are created for team pairs in team list, then days are created for the
+            longest series. Days are resolved once, series and series parts are written with
+            one bulk insert each inside a single transaction.
+            Matches are only created when they are played (see play_post_season_days).
 
         :param team_list: List of teams
         :return: None
         """
-        for team_idx in range(0, len(team_list) // 2):
-            team_pair = [team_list[team_idx], team_list[len(team_list) - 1 - team_idx]]
-            new_series = Series(schedule=self)
-            new_series.save()
-            new_series_home_team_part = SeriesPart(team=team_pair[0], series=new_series, lead=True)
-            new_series_home_team_part.save()
-            new_series_away_team_part = SeriesPart(team=team_pair[1], series=new_series, lead=False)
-            new_series_away_team_part.save()
-            home_selector = True
-            for day_number in range(1, int(new_series.length) + 1):
-                try:
-                    new_day = self.day_set.get(number=day_number)
-                except Day.DoesNotExist:
-                    new_day = Day(number=day_number, schedule=self)
-                    new_day.save()
-                new_match = Match(day=new_day)
-                new_match.save()
-                home_team = new_series.seriespart_set.get(lead=home_selector).team
-                new_match_home_team_part = MatchPart(team=home_team, match=new_match, location='home')
-                new_match_home_team_part.save()
-                away_team = new_series.seriespart_set.get(lead=not home_selector).team
-                new_match_away_team_part = MatchPart(team=away_team, match=new_match, location='away')
-                new_match_away_team_part.save()
-                new_series.matches.add(new_match)
-                new_series.save()
-                home_selector = not home_selector
-            self.save()
+        team_list = list(team_list)
+        team_pairs = [(team_list[team_idx], team_list[len(team_list) - 1 - team_idx])
+                      for team_idx in range(0, len(team_list) // 2)]
+        if not team_pairs:
+            return
+
+        with transaction.atomic():
+            # series without parts are the ones created here
+            new_series = bulk.bulk_create([Series(schedule=self) for _ in team_pairs],
+                                          self.series_set.filter(seriespart__isnull=True))
+            series_parts = []
+            for series, (lead_team, non_lead_team) in zip(new_series, team_pairs):
+                series_parts.append(SeriesPart(team=lead_team, series=series, lead=True))
+                series_parts.append(SeriesPart(team=non_lead_team, series=series, lead=False))
+            SeriesPart.objects.bulk_create(series_parts)
+
+            day_numbers = set(self.day_set.values_list('number', flat=True))
+            last_day = max(int(series.length) for series in new_series)
+            Day.objects.bulk_create([Day(number=day_number, schedule=self) for day_number in range(1, last_day + 1)
+                                     if day_number not in day_numbers])
+            League.schedules_changed([self.pk])
 
     def play_regular_season(self, match_phase="regular_time"):
         """ plays a regular season schedule
             It selects the next day in the schedule until the schedule is
             completed and plays all day's matches.
-            When a match is played, first the teams' strenghts are gathered,
-            second a home advantage is applied (if needed),
-            third a "luck factor" is computed by drawing random numbers,
-            Now strengths are adjusted according to the above factors and
-            normalized, such that a decision can be taken if the match
-            ended with a home team victory, loss or a draw.
-            A score is also generated by looking up a score distribution table
 
         :param match_phase: phase of the match, e.g. regular time, extra time
 
         :return:
         """
+        Schedule.play_next_days([self], match_phase=match_phase)
 
-        if self.current_day:
-            self.current_day += 1
-        else:
-            self.current_day = 1
-        self.save()
-        # Play all matches in the selected day
-        try:
-            day = self.day_set.get(number=self.current_day)
-        except Day.DoesNotExist:
-            self.completed = True
-            self.save()
-        else:
-            for match in day.match_set.all():
-                # 1) get strengths
-                strength1 = float(match.home_team.strength)
-                strength2 = float(match.away_team.strength)
-                # 2) apply home advantage
-                if match.home_advantage:
-                    strength1 *= 2
-                # 3) Luck factor
-                strength1 = random.uniform(0, strength1)
-                strength2 = random.uniform(0, strength2)
-                # Normalize Strength
-                total_strength = strength1 + strength2
-                rel_strength1 = strength1 / total_strength
-                rel_strength2 = strength2 / total_strength
-                rel_strength_ratio = rel_strength1 / rel_strength2
-                # Take decision
-                if rel_strength_ratio > 2:
-                    match.outcome = '1'
-                    match.home_team.update_points(3)
-                elif rel_strength_ratio < 0.5:
-                    match.outcome = '2'
-                    match.away_team.update_points(3)
-                else:
-                    match.outcome = 'X'
-                    match.home_team.update_points(1)
-                    match.away_team.update_points(1)
-                # Generate score based on results
-                score = match.generate_score(match_phase=match_phase, match_result=match.outcome)
-                match.score = score
-                match.save()
+    @staticmethod
+    def play_next_days(schedules, match_phase="regular_time", rng=None):
+        """ plays the next day of many schedules in one batch
+            Every schedule moves to its next day, schedules without a next day
+            are marked as completed.
+            All the matches of the selected days are loaded together with their
+            teams, outcomes and scores are computed in memory (see
+            simulation.match_outcome) and results are written back with one
+            update for the matches, one for the teams' points and one for the
+            standings, all inside a single transaction. The number of queries does not depend on the
+            number of schedules or matches.
+            Points and standings are incremented in the database (see
+            bulk.bulk_increment) and the day is claimed with a conditional
+            update (see claim_next_days), so concurrent requests never lose
+            results nor play a day twice.
+
+        :param schedules: list of schedules
+        :param match_phase: phase of the match, e.g. regular time, extra time
+        :param rng: random.Random instance, the global random generator by default
+        :return: None
+        """
+        schedules = list(schedules)
+        if not schedules:
+            return
+        schedule_ids = [schedule.pk for schedule in schedules]
+
+        with transaction.atomic():
+            Schedule.claim_next_days(schedules)
+            days = Day.objects.filter(schedule__in=schedule_ids, number=models.F('schedule__current_day'))
+            days = dict(days.values_list('id', 'schedule_id'))
+
+            played_ids = set(days.values())
+            completed_ids = [pk for pk in schedule_ids if pk not in played_ids]
+            if completed_ids:
+                Schedule.objects.filter(pk__in=completed_ids).update(completed=True)
+            for schedule in schedules:
+                schedule.completed = schedule.completed or schedule.pk in completed_ids
+
+            # Play all matches in the selected days
+            matches = Match.objects.filter(day__in=list(days)).order_by(*Match.PLAY_ORDER)
+            matches = list(matches.select_related('home_team', 'away_team'))
+            table = Match.play_matches(matches, match_phase=match_phase, rng=rng)
+
+            bulk.bulk_update(matches, ['outcome', 'score', 'home_goals', 'away_goals'])
+            Standing.add_results(schedule_ids, table)
+            League.schedules_changed(schedule_ids)
+
+    @staticmethod
+    def claim_next_days(schedules):
+        """ moves many schedules to their next day
+            The move is a conditional update: a schedule only moves if its
+            current day is still the one that was read, so of two concurrent
+            requests playing the same day exactly one claims it, the other
+            gets a ScheduleConflict. It must run inside the transaction that
+            plays the day, the claimed rows stay locked until it commits.
+
+        :param schedules: list of schedules, as read before playing
+        :return: None
+        """
+        by_day = {}
+        for schedule in schedules:
+            by_day.setdefault(schedule.current_day, []).append(schedule.pk)
+        claimed = 0
+        for current_day, schedule_ids in by_day.items():
+            claimed += Schedule.objects.filter(pk__in=schedule_ids, current_day=current_day).update(
+                current_day=models.F('current_day') + 1)
+        if claimed != len(schedules):
+            raise ScheduleConflict('Schedules have been played concurrently')
+        for schedule in schedules:
+            schedule.current_day += 1
+
+    @staticmethod
+    def play_post_season_days(schedules, rng=None):
+        """ plays the next day of many post season schedules in one batch
+            Every series that is still open plays its next game, the lead
+            team hosting the odd games. Series are loaded together with their
+            teams and games, games are decided in memory (see
+            simulation.series_game) and only the played matches are written,
+            with one bulk insert per model. Unplayed games, as created up front
+            by older schedules, are ignored. A schedule is completed once all
+            its series have a winner.
+
+        :param schedules: list of schedules
+        :param rng: random.Random instance, the global random generator by default
+        :return: None
+        """
+        schedules = [schedule for schedule in schedules if not schedule.completed]
+        if not schedules:
+            return
+        schedule_ids = [schedule.pk for schedule in schedules]
+
+        with transaction.atomic():
+            Schedule.claim_next_days(schedules)
+            series_list = Series.objects.filter(schedule__in=schedule_ids).prefetch_related(
+                models.Prefetch('seriespart_set', queryset=SeriesPart.objects.select_related('team')), 'matches')
+            open_series = []
+            for series in series_list:
+                wins = series.wins()
+                if max(wins.values()) < series.wins_needed:
+                    open_series.append((series, wins))
+
+            # days of the games, in case they were not created with the series
+            days = Day.objects.filter(schedule__in=schedule_ids, number=models.F('schedule__current_day'))
+            days = dict((day.schedule_id, day) for day in days)
+            missing_days = [Day(number=schedule.current_day, schedule=schedule) for schedule in schedules
+                            if schedule.pk not in days and
+                            any(series.schedule_id == schedule.pk for series, _ in open_series)]
+            bulk.bulk_create(missing_days, Day.objects.filter(schedule__in=[day.schedule_id for day in missing_days],
+                                                              number=models.F('schedule__current_day')))
+            days.update((day.schedule_id, day) for day in missing_days)
+
+            new_matches = []
+            for series, wins in open_series:
+                teams = dict((part.lead, part.team) for part in series.seriespart_set.all())
+                home_team, away_team = teams[True], teams[False]
+                # every played game has a winner, unplayed ones count for nothing
+                if sum(wins.values()) % 2:
+                    home_team, away_team = away_team, home_team
+                match = Match(day=days[series.schedule_id], home_team=home_team, away_team=away_team)
+                match.outcome, score = simulation.series_game(home_team.strength, away_team.strength,
+                                                              home_advantage=match.home_advantage, rng=rng)
+                match.set_score(score)
+                winner = home_team if match.outcome == '1' else away_team
+                wins[winner.pk] += 1
+                new_matches.append((series, match))
+
+            # today's matches that belong to no series yet are the ones inserted here
+            matches = bulk.bulk_create([match for _, match in new_matches],
+                                       Match.objects.filter(day__in=[day.pk for day in days.values()],
+                                                            series__isnull=True))
+            MatchPart.objects.bulk_create(MatchPart.for_matches(matches))
+            Series.matches.through.objects.bulk_create([Series.matches.through(series=series, match=match)
+                                                        for series, match in new_matches])
+
+            # a schedule is over once none of its series is open after today's games
+            open_ids = set(series.schedule_id for series, wins in open_series
+                           if max(wins.values()) < series.wins_needed)
+            for schedule in schedules:
+                schedule.completed = schedule.pk not in open_ids
+            bulk.bulk_update(schedules, ['completed'])
+            League.schedules_changed(schedule_ids)
+
+    @staticmethod
+    def play_remaining_days(schedules, match_phase="regular_time", rng=None):
+        """ plays all the remaining days of many schedules in one batch
+            All the matches that have not been played yet are loaded at once,
+            played in memory day after day in Match.PLAY_ORDER and written
+            back in bulk together with the teams' points. Schedules are left
+            completed, as if every day had been played one at a time. The
+            number of queries does not depend on the number of matches.
+
+        :param schedules: list of schedules
+        :param match_phase: phase of the match, e.g. regular time, extra time
+        :param rng: random.Random instance, the global random generator by default
+        :return: None
+        """
+        schedules = [schedule for schedule in schedules if not schedule.completed]
+        if not schedules:
+            return
+        schedule_ids = [schedule.pk for schedule in schedules]
+
+        with transaction.atomic():
+            # claiming the next day keeps concurrent requests from playing the same days
+            Schedule.claim_next_days(schedules)
+            matches = Match.objects.filter(day__schedule__in=schedule_ids,
+                                           day__number__gte=models.F('day__schedule__current_day'))
+            matches = matches.order_by(*Match.PLAY_ORDER)
+            matches = list(matches.select_related('home_team', 'away_team'))
+            table = Match.play_matches(matches, match_phase=match_phase, rng=rng)
+
+            last_days = Day.objects.filter(schedule__in=schedule_ids).values_list('schedule')
+            last_days = dict(last_days.annotate(last_day=models.Max('number')))
+            for schedule in schedules:
+                # the day after the last one is where a schedule finds out it is completed
+                schedule.current_day = last_days.get(schedule.pk, 0) + 1
+                schedule.completed = True
+
+            bulk.bulk_update(matches, ['outcome', 'score', 'home_goals', 'away_goals'])
+            Standing.add_results(schedule_ids, table)
+            bulk.bulk_update(schedules, ['current_day', 'completed'])
+            League.schedules_changed(schedule_ids)
 
 
 class Division(models.Model):
     """ Implements a Division object """
 
     # Class variables
+    POST_SEASON_SUFFIX = ' Post Season'
     name = models.CharField(max_length=128)
     conference = models.ForeignKey(Conference)
-    schedule = models.ForeignKey(Schedule)
+    schedule = models.OneToOneField(Schedule, related_name='division')
+    # created with the post season, the regular season schedule is kept alongside
+    post_season_schedule = models.OneToOneField(Schedule, null=True, blank=True, on_delete=models.SET_NULL,
+                                                related_name='post_season_division')
 
     def __str__(self):
         """ __str__ overwrite """
         return self.name
 
+    @property
+    def post_season_name(self):
+        """ returns the name of the division's post season schedule, the division's name cut to fit Schedule.name """
+        max_length = Schedule._meta.get_field('name').max_length
+        return self.name[0:max_length - len(Division.POST_SEASON_SUFFIX)] + Division.POST_SEASON_SUFFIX
+
+    @property
+    def current_schedule(self):
+        """ returns the post season schedule once created, the regular season schedule otherwise """
+        return self.post_season_schedule or self.schedule
+
     @property
     def sorted_team_set(self):
         """ returns a list of teams in a descending order by points"""
@@ -314,23 +686,64 @@ class Division(models.Model):
 
     def create_regular_season_schedule(self):
         """ creates regular season schedule
-            It first reset all teams' points, then resets the schedule
+            It first resets the teams and the schedules, see reset_seasons
+
+        :return: None
+        """
+        with transaction.atomic():
+            Division.reset_seasons([self])
+            self.schedule.create_regular_season(self.team_set.all())
 
+    @staticmethod
+    def reset_seasons(divisions):
+        """ tears down the seasons of many divisions in one transaction
+            The teams' points and playoff flags are reset with a single
+            update, the regular season schedules are reset and the post
+            season schedules deleted with set-based deletes (see
+            Schedule.clear_schedules), so no match is loaded in memory.
+
+        :param divisions: list of divisions
         :return: None
         """
-        for team in self.team_set.all():
-            team.reset()
-        self.schedule.reset()
-        self.schedule.create_regular_season(self.team_set.all())
+        divisions = list(divisions)
+        if not divisions:
+            return
+        schedule_ids = [division.schedule_id for division in divisions]
+        post_season_ids = [division.post_season_schedule_id for division in divisions
+                           if division.post_season_schedule_id is not None]
+        with transaction.atomic():
+            Team.objects.filter(division__in=divisions).update(points=0, playoffs=False)
+            Schedule.clear_schedules(schedule_ids + post_season_ids)
+            Schedule.objects.filter(pk__in=schedule_ids).update(current_day=0, completed=False)
+            if post_season_ids:
+                # the previous season's post season goes with it
+                Division.objects.filter(post_season_schedule__in=post_season_ids).update(post_season_schedule=None)
+                bulk.bulk_delete(Schedule.objects.filter(pk__in=post_season_ids))
+            League.schedules_changed(schedule_ids)
+        for division in divisions:
+            division.schedule.current_day = 0
+            division.schedule.completed = False
+            division.post_season_schedule = None
 
     def create_post_season_schedule(self):
         """ creates post season schedule
+            The series are created in the division's post season schedule,
+            which is created the first time, so the regular season schedule
+            keeps its days and table.
 
         :return: None
         """
-        self.schedule.reset()
-        self.schedule.create_post_season_series(self.team_set.filter(playoffs=True))
-        self.schedule.create_post_season_series(self.team_set.filter(playoffs=False))
+        with transaction.atomic():
+            if self.post_season_schedule is None:
+                self.post_season_schedule = Schedule.objects.create(name=self.post_season_name)
+                Division.objects.filter(pk=self.pk).update(post_season_schedule=self.post_season_schedule)
+            else:
+                self.post_season_schedule.reset()
+            schedule = self.post_season_schedule
+            # seeded in table order, with the same tie breaks as set_playoff_teams
+            table = [standing.team for standing in self.schedule.sorted_standing_set]
+            schedule.create_post_season_series([team for team in table if team.playoffs])
+            schedule.create_post_season_series([team for team in table if not team.playoffs])
 
     def play_regular_season_schedule(self):
         """ plays regular season schedule
@@ -338,15 +751,58 @@ class Division(models.Model):
         :return: True/False if schedule is completed
         :rtype: bool
         """
-        self.schedule.play_regular_season()
-        completed = self.schedule.completed
+        return Division.play_regular_season_schedules([self])
+
+    @staticmethod
+    def play_regular_season_schedules(divisions, rng=None):
+        """ plays the next day of many divisions' regular season schedules
+            Once a schedule is completed the upper half of its division's
+            table qualifies for the playoffs.
+
+        :param divisions: list of divisions
+        :param rng: random.Random instance, the global random generator by default
+        :return: True/False if any schedule is completed
+        :rtype: bool
+        """
+        divisions = list(divisions)
+        Schedule.play_next_days([division.schedule for division in divisions], rng=rng)
+        completed = [division for division in divisions if division.schedule.completed]
+        Division.set_playoff_teams(completed)
+
+        return len(completed) > 0
 
-        if completed:
-            for team in self.sorted_team_set[0:len(self.sorted_team_set) // 2]:
-                team.playoffs = True
-                team.save()
+    @staticmethod
+    def play_regular_season_schedules_to_end(divisions, rng=None):
+        """ plays all the remaining days of many divisions' regular season
+            schedules and qualifies the playoff teams
 
-        return completed
+        :param divisions: list of divisions
+        :param rng: random.Random instance, the global random generator by default
+        :return: None
+        """
+        divisions = list(divisions)
+        Schedule.play_remaining_days([division.schedule for division in divisions], rng=rng)
+        Division.set_playoff_teams(divisions)
+
+    @staticmethod
+    def set_playoff_teams(divisions):
+        """ flags the upper half of every division's table for the playoffs
+
+        :param divisions: list of divisions
+        :return: None
+        """
+        schedule_ids = [division.schedule_id for division in divisions]
+        if not schedule_ids:
+            return
+        tables = {}
+        standings = Standing.objects.filter(schedule__in=schedule_ids).order_by('schedule', *Standing.TABLE_ORDER)
+        for team_id, schedule_id in standings.values_list('team_id', 'schedule_id'):
+            tables.setdefault(schedule_id, []).append(team_id)
+        playoff_ids = []
+        for team_ids in tables.values():
+            playoff_ids.extend(team_ids[0:len(team_ids) // 2])
+        Team.objects.filter(pk__in=playoff_ids).update(playoffs=True)
+        League.schedules_changed(schedule_ids)
 
 
 class Team(models.Model):
@@ -369,14 +825,54 @@ class Team(models.Model):
         :param value: points
         :return: None
         """
-        self.points += value
-        self.save()
+        Team.objects.filter(pk=self.pk).update(points=models.F('points') + value)
+        self.refresh_from_db(fields=['points'])
+        League.changed(conference__division__team=self)
 
     def reset(self):
         """ reset """
         self.points = 0
         self.playoffs = False
-        self.save()
+        Team.objects.filter(pk=self.pk).update(points=0, playoffs=False)
+        League.changed(conference__division__team=self)
+
+
+class Standing(models.Model):
+    """ Implements a Standing object, a team's row in a schedule's table """
+
+    # Class variables
+    TABLE_ORDER = ('-points', '-goal_difference', '-goals_for', 'team__name')
+    team = models.ForeignKey(Team)
+    schedule = models.ForeignKey(Schedule)
+    played = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    goals_for = models.IntegerField(default=0)
+    goals_against = models.IntegerField(default=0)
+    goal_difference = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        """ Meta class """
+        unique_together = ('schedule', 'team')
+        index_together = ('schedule', 'points', 'goal_difference', 'goals_for')
+
+    def __str__(self):
+        """ __str__ overwrite """
+        return self.team.name + ": " + str(self.points)
+
+    @staticmethod
+    def add_results(schedule_ids, table):
+        """ adds played matches to the teams' points and to the standings
+            of their schedules, with one update each
+
+        :param schedule_ids: ids of the schedules the matches belong to
+        :param table: dict of team id -> table columns to add (see Match.play_matches)
+        :return: None
+        """
+        bulk.bulk_increment(Team, dict((team_id, {'points': row['points']}) for team_id, row in table.items()))
+        bulk.bulk_increment(Standing.objects.filter(schedule__in=schedule_ids), table, key='team')
 
 
 class Day(models.Model):
@@ -386,6 +882,11 @@ class Day(models.Model):
     number = models.IntegerField(default=0)
     schedule = models.ForeignKey(Schedule)
 
+    class Meta:
+        """ Meta class """
+        # a schedule's days are looked up by number
+        unique_together = ('schedule', 'number')
+
     def __str__(self):
         """ __str__ overwrite """
         return self.schedule.name + " - Day " + str(self.number)
@@ -400,9 +901,18 @@ class Match(models.Model):
         ('1', 'home'),
         ('2', 'away'),
     )
+    # Matches are played in this order, a day at a time, so a season drawn from a seeded
+    # generator is the same whether its days are played one by one or all at once
+    PLAY_ORDER = ('day__number', 'day__schedule', 'id')
     teams = models.ManyToManyField(Team, through='MatchPart')
     day = models.ForeignKey(Day)
+    # same teams as the match parts, kept on the match to avoid joins
+    home_team = models.ForeignKey(Team, null=True, related_name='home_matches')
+    away_team = models.ForeignKey(Team, null=True, related_name='away_matches')
     score = models.CharField(max_length=10, default='0-0')
+    # goals of the score, for aggregations in the database (see the stats module), null until played
+    home_goals = models.IntegerField(null=True, db_index=True)
+    away_goals = models.IntegerField(null=True, db_index=True)
     outcome = models.CharField(max_length=1, choices=OUTCOMES, null=True)
     home_advantage = models.BooleanField(default=True)
 
@@ -414,63 +924,66 @@ class Match(models.Model):
         """ __str__ overwrite """
         return "Day " + str(self.day.number) + " - " + self.home_team.name + " vs. " + self.away_team.name
 
-    @property
-    def home_team(self):
-        """ returns the home team """
-        return self.matchpart_set.get(location='home').team
-
-    @property
-    def away_team(self):
-        """ returns the home team """
-        return self.matchpart_set.get(location='away').team
+    @staticmethod
+    def play_matches(matches, match_phase="regular_time", rng=None):
+        """ plays a list of matches in memory
+            Outcome and score of every match are set on the instances, which
+            are expected to have their teams loaded with select_related.
+            Matches are played a day at a time: the outcomes of the day are
+            drawn first, then the scores of the day with one
+            scores.generate_scores call per result, so the matches of a day
+            must be consecutive (see PLAY_ORDER). Nothing is saved.
+
+        :param matches: list of matches
+        :param match_phase: phase of the match, e.g. regular time, extra time
+        :param rng: random.Random instance, the global random generator by default
+        :return: dict of team id -> table columns to add (see simulation.table_rows)
+        :rtype: dict
+        """
+        table = {}
+        for _, day_matches in itertools.groupby(matches, key=lambda match: match.day_id):
+            by_result = {}
+            for match in day_matches:
+                match.outcome = simulation.match_outcome(match.home_team.strength, match.away_team.strength,
+                                                         home_advantage=match.home_advantage, rng=rng)
+                by_result.setdefault(match.outcome, []).append(match)
+            # Generate scores based on results
+            for result in sorted(by_result):
+                result_matches = by_result[result]
+                for match, score in zip(result_matches, scores.generate_scores(match_phase, result,
+                                                                               len(result_matches), rng=rng)):
+                    match.set_score(score)
+                    home_row, away_row = simulation.table_rows(match.outcome, match.score)
+                    simulation.add_to_table(table, match.home_team_id, home_row)
+                    simulation.add_to_table(table, match.away_team_id, away_row)
+
+        return table
+
+    def set_score(self, score):
+        """ sets the score and the goals it is made of
+
+        :param score: a string with the score, e.g. '2-1'
+        :return: None
+        """
+        self.score = score
+        self.home_goals, self.away_goals = scores.split_score(score)
 
     @staticmethod
-    def generate_score(match_phase, match_result):
+    def generate_score(match_phase, match_result, rng=None):
         """ generates the score
             The user would pass a match phase (i.e. regular time or extra time)
             and a math result in terms of home victory, loss or draw
             Based on the two inputs a probable score is genrated and returned
+            from the precomputed tables of the scores module
 
         :param match_phase: a string with either regular or extra time
         :param match_result: a string with 'X' (draw), '1' or '2' (home or away victory)
+        :param rng: random.Random instance, the global random generator by default
         :return: a string with the score
         :rtype: str
         """
 
-        reglr_time_home = {'1-0': 0.125, '2-0': 0.090, '2-1': 0.093, '3-0': 0.045,
-                           '4-0': 0.025, '3-1': 0.045, '3-2': 0.020, '4-1': 0.015,
-                           '5-0': 0.005, '4-2': 0.007, '5-1': 0.005, '6-0': 0.002,
-                           '4-3': 0.003, '5-2': 0.001, '6-1': 0.001, '7-0': 0.001}
-        reglr_time_away = {'0-1': 0.065, '0-2': 0.050, '1-2': 0.053, '0-3': 0.015,
-                           '0-4': 0.015, '1-3': 0.025, '2-3': 0.015, '1-4': 0.010,
-                           '0-5': 0.003, '2-4': 0.002, '1-5': 0.002, '0-6': 0.001,
-                           '3-4': 0.002, '2-5': 0.001, '1-6': 0.001, '0-7': 0.001}
-        reglr_time_draw = {'0-0': 0.085, '1-1': 0.120, '2-2': 0.045, '3-3': 0.007}
-
-        extra_time_home = {'1-0': 0.150, '2-0': 0.115, '2-1': 0.110, '3-0': 0.070}
-        extra_time_away = {'0-1': 0.095, '0-2': 0.075, '1-2': 0.080, '0-3': 0.040}
-        extra_time_draw = {'0-0': 0.120, '1-1': 0.145}
-
-        lookup_tables = {('regular_time', '1'): reglr_time_home,
-                         ('regular_time', '2'): reglr_time_away,
-                         ('regular_time', 'X'): reglr_time_draw,
-                         ('extra_time', '1'): extra_time_home,
-                         ('extra_time', '2'): extra_time_away,
-                         ('extra_time', 'X'): extra_time_draw}
-
-        # Move in __init__
-        lookup_table = lookup_tables[(match_phase, match_result)]
-        total = 0
-        for prob in lookup_table.values():
-            total += prob
-
-        roll = random.uniform(0, total)
-
-        current_val = 0
-        for res, prob in lookup_table.items():
-            current_val += prob
-            if roll <= current_val:
-                return res
+        return scores.generate_score(match_phase, match_result, rng=rng)
 
 
 class MatchPart(models.Model):
@@ -482,11 +995,30 @@ class MatchPart(models.Model):
     location = models.CharField(max_length=4)
     # winner = models.BooleanField(null=True, blank=True)
 
+    class Meta:
+        """ Meta class """
+        unique_together = ('match', 'location')
+
     def __str__(self):
         """ __str__ overwrite """
 
         return self.team.name + " in " + self.match.__str__()
 
+    @staticmethod
+    def for_matches(matches):
+        """ returns the home and away match parts of saved matches
+
+        :param matches: list of matches with home and away teams
+        :return: list of match parts
+        :rtype: list
+        """
+        match_parts = []
+        for match in matches:
+            match_parts.append(MatchPart(team_id=match.home_team_id, match=match, location='home'))
+            match_parts.append(MatchPart(team_id=match.away_team_id, match=match, location='away'))
+
+        return match_parts
+
 
 class Series(models.Model):
     """ Implements a Match object """
@@ -515,6 +1047,28 @@ class Series(models.Model):
         """ returns the home team """
         return self.seriespart_set.get(lead=False).team
 
+    @property
+    def wins_needed(self):
+        """ returns the number of games needed to win the series """
+        return self.length // 2 + 1
+
+    def wins(self):
+        """ returns the number of games won by every team
+            It reads the series' parts and matches, which are best prefetched
+            when many series are involved.
+
+        :return: dict of team id -> games won
+        :rtype: dict
+        """
+        wins = dict((part.team_id, 0) for part in self.seriespart_set.all())
+        for match in self.matches.all():
+            if match.outcome == '1':
+                wins[match.home_team_id] += 1
+            elif match.outcome == '2':
+                wins[match.away_team_id] += 1
+
+        return wins
+
 
 class SeriesPart(models.Model):
     """ Implements a Series Part object """
@@ -525,7 +1079,259 @@ class SeriesPart(models.Model):
     lead = models.BooleanField(default=False)
     # winner = models.BooleanField(null=True, blank=True)
 
+    class Meta:
+        """ Meta class """
+        unique_together = ('series', 'lead')
+
     def __str__(self):
         """ __str__ overwrite """
 
         return self.team.name + " in " + self.series.__str__()
+
+
+class Job(models.Model):
+    """ Implements a Job object, a league operation run in the background
+        (see the jobs module and the run_jobs command)
+    """
+
+    # Class variables
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'queued'),
+        (RUNNING, 'running'),
+        (DONE, 'done'),
+        (FAILED, 'failed'),
+    )
+    OPERATIONS = (
+        ('create_regular_season', 'create regular season'),
+        ('play_regular_season', 'play regular season day'),
+        ('play_regular_season_to_end', 'play regular season to end'),
+        ('create_post_season', 'create post season'),
+        ('play_post_season', 'play post season day'),
+    )
+    league = models.ForeignKey(League)
+    operation = models.CharField(max_length=32, choices=OPERATIONS)
+    # day the operation expects to play, see League.current_day
+    day = models.IntegerField(null=True, blank=True)
+    status = models.CharField(max_length=8, choices=STATUSES, default=QUEUED)
+    progress = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    worker = models.CharField(max_length=128, blank=True, default='')
+    created = models.DateTimeField(auto_now_add=True)
+    not_before = models.DateTimeField(null=True, blank=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        """ Meta class """
+        index_together = ('status', 'id')
+
+    def __str__(self):
+        """ __str__ overwrite """
+        return self.league.name + " - " + self.get_operation_display() + " (" + self.status + ")"
+
+    def set_progress(self, progress, total):
+        """ records how far the operation has got
+
+        :param progress: number of steps done
+        :param total: number of steps
+        :return: None
+        """
+        self.progress = progress
+        self.total = total
+        Job.objects.filter(pk=self.pk).update(progress=progress, total=total)
+
+    def as_dict(self):
+        """ returns the job's status, as shown by the status endpoint
+
+        :return: job status
+        :rtype: dict
+        """
+        return {
+            'id': self.pk,
+            'league': self.league_id,
+            'operation': self.operation,
+            'day': self.day,
+            'status': self.status,
+            'progress': self.progress,
+            'total': self.total,
+            'error': self.error,
+            'created': self.created.isoformat() if self.created else None,
+            'started': self.started.isoformat() if self.started else None,
+            'finished': self.finished.isoformat() if self.finished else None,
+        }
+
+    @staticmethod
+    def claim_next(worker, stale_seconds=League.LOCK_SECONDS):
+        """ takes the oldest job waiting to run
+            A job is taken with a conditional update from its current status,
+            so of many workers polling the table exactly one gets it. Jobs of
+            a league wait for its running job, so a league's jobs run in
+            order. Jobs left running by a worker that died are taken again
+            once their league's lock would have expired.
+
+        :param worker: name of the worker taking the job
+        :param stale_seconds: time after which a running job is considered abandoned
+        :return: the job, None if there is nothing to run
+        :rtype: Job
+        """
+        now = timezone.now()
+        stale = models.Q(status=Job.RUNNING, started__lt=now - datetime.timedelta(seconds=stale_seconds))
+        busy_leagues = Job.objects.filter(status=Job.RUNNING).exclude(stale).values('league')
+        ready = models.Q(status=Job.QUEUED) & (models.Q(not_before__isnull=True) | models.Q(not_before__lte=now))
+        ready = ready & ~models.Q(league__in=busy_leagues)
+        for job in Job.objects.filter(ready | stale).order_by('id')[0:10]:
+            if Job.objects.filter(pk=job.pk, status=job.status, started=job.started).update(
+                    status=Job.RUNNING, worker=worker, started=now):
+                job.status, job.worker, job.started = Job.RUNNING, worker, now
+                return job
+
+        return None
+
+    def finish(self, status, error=''):
+        """ records the end of the job
+
+        :param status: DONE or FAILED
+        :param error: description of the failure
+        :return: None
+        """
+        self.status, self.error, self.finished = status, error, timezone.now()
+        Job.objects.filter(pk=self.pk).update(status=self.status, error=self.error, finished=self.finished)
+
+    def retry(self, seconds):
+        """ puts the job back in the queue
+
+        :param seconds: delay before the job can be taken again
+        :return: None
+        """
+        self.status, self.not_before = Job.QUEUED, timezone.now() + datetime.timedelta(seconds=seconds)
+        Job.objects.filter(pk=self.pk).update(status=self.status, not_before=self.not_before, started=None)
+
+
+class Season(models.Model):
+    """ Implements a Season object, an archived season of a league """
+
+    # Class variables
+    league = models.ForeignKey(League)
+    number = models.IntegerField()
+    archived = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        """ Meta class """
+        unique_together = ('league', 'number')
+
+    def __str__(self):
+        """ __str__ overwrite """
+        return self.league.name + " - Season " + str(self.number)
+
+
+class ArchivedMatch(models.Model):
+    """ Implements an ArchivedMatch object, a played match of an archived season
+        Rows are compact: goals instead of the score and no match parts, a
+        team's matches are found through the (team, season) indexes.
+    """
+
+    # Class variables
+    REGULAR_SEASON = 'R'
+    POST_SEASON = 'P'
+    STAGES = (
+        (REGULAR_SEASON, 'regular season'),
+        (POST_SEASON, 'post season'),
+    )
+    # the composite indexes below cover the season and team lookups
+    season = models.ForeignKey(Season, db_index=False)
+    division = models.ForeignKey(Division)
+    stage = models.CharField(max_length=1, choices=STAGES)
+    day = models.SmallIntegerField()
+    home_team = models.ForeignKey(Team, db_index=False, related_name='archived_home_matches')
+    away_team = models.ForeignKey(Team, db_index=False, related_name='archived_away_matches')
+    home_goals = models.SmallIntegerField()
+    away_goals = models.SmallIntegerField()
+    outcome = models.CharField(max_length=1, choices=Match.OUTCOMES)
+
+    class Meta:
+        """ Meta class """
+        index_together = (
+            ('season', 'stage', 'day'),
+            ('home_team', 'season'),
+            ('away_team', 'season'),
+        )
+
+    def __str__(self):
+        """ __str__ overwrite """
+        return ("Season " + str(self.season.number) + " - Day " + str(self.day) + " - " + self.home_team.name +
+                " vs. " + self.away_team.name)
+
+    @property
+    def score(self):
+        """ returns the score, as Match.score """
+        return str(self.home_goals) + '-' + str(self.away_goals)
+
+
+class ArchivedStanding(models.Model):
+    """ Implements an ArchivedStanding object, a team's final row in an archived season's table """
+
+    # Class variables
+    # the unique constraint and the index below cover the season and team lookups
+    season = models.ForeignKey(Season, db_index=False)
+    team = models.ForeignKey(Team, db_index=False)
+    division = models.ForeignKey(Division)
+    position = models.SmallIntegerField()
+    playoffs = models.BooleanField(default=False)
+    played = models.SmallIntegerField(default=0)
+    wins = models.SmallIntegerField(default=0)
+    draws = models.SmallIntegerField(default=0)
+    losses = models.SmallIntegerField(default=0)
+    goals_for = models.SmallIntegerField(default=0)
+    goals_against = models.SmallIntegerField(default=0)
+    points = models.SmallIntegerField(default=0)
+
+    class Meta:
+        """ Meta class """
+        unique_together = ('season', 'team')
+        index_together = ('team', 'season')
+
+    def __str__(self):
+        """ __str__ overwrite """
+        return "Season " + str(self.season.number) + " - " + self.team.name + ": " + str(self.points)
+
+    @property
+    def goal_difference(self):
+        """ returns goals for minus goals against """
+        return self.goals_for - self.goals_against
+
+
+def league_changed(sender, instance, **kwargs):
+    """ stamps the league of a saved or deleted instance with a new version, see League.changed
+        The model methods stamp the leagues they change themselves, this
+        catches the changes made with save() or delete() to the models
+        edited outside of them, e.g. in the admin. Days and matches are
+        only written in bulk by the schedules, which send no signal, so they
+        are left out and the admin stamps them (see admin.ScheduleChangeAdmin).
+        A deleted schedule takes its division along, whose signal stamps
+        the league.
+
+    :param sender: model class
+    :param instance: the saved or deleted instance
+    :return: None
+    """
+    if sender is League:
+        League.changed(pk=instance.pk)
+    elif sender is Conference:
+        League.changed(pk=instance.league_id)
+    elif sender is Division:
+        League.changed(conference=instance.conference_id)
+    elif sender is Team:
+        League.changed(conference__division=instance.division_id)
+    elif sender is Schedule:
+        League.schedules_changed([instance.pk])
+
+
+for league_model in (League, Conference, Division, Team):
+    post_save.connect(league_changed, sender=league_model)
+    post_delete.connect(league_changed, sender=league_model)
+post_save.connect(league_changed, sender=Schedule)
@@ -0,0 +1,190 @@
+import concurrent.futures
+
+import numpy as np
+
+from ncl_app import round_robin
+
+
+class SeasonForecast(object):
+    """ Implements the aggregated results of many simulated seasons
+        All the distributions are kept as counts, so that forecasts computed
+        separately can be merged.
+    """
+
+    def __init__(self, team_count, max_points):
+        """ initializes empty distributions
+
+        :param team_count: number of teams
+        :param max_points: maximum number of points a team can collect
+        """
+        self.seasons = 0
+        # points[team, p]: seasons the team ended with p points
+        self.points = np.zeros((team_count, max_points + 1), dtype=np.int64)
+        # positions[team, p]: seasons the team ended in position p (0 is first)
+        self.positions = np.zeros((team_count, team_count), dtype=np.int64)
+        # playoffs[team]: seasons the team qualified for the playoffs
+        self.playoffs = np.zeros(team_count, dtype=np.int64)
+
+    def merge(self, other):
+        """ adds the counts of another forecast of the same teams
+
+        :param other: a SeasonForecast
+        :return: None
+        """
+        self.seasons += other.seasons
+        self.points += other.points
+        self.positions += other.positions
+        self.playoffs += other.playoffs
+
+    def expected_points(self):
+        """ returns the average points of every team """
+        return self.points.dot(np.arange(self.points.shape[1])) / float(self.seasons)
+
+    def position_odds(self):
+        """ returns the probability of every team to end in every position """
+        return self.positions / float(self.seasons)
+
+    def playoff_odds(self):
+        """ returns the probability of every team to qualify for the playoffs """
+        return self.playoffs / float(self.seasons)
+
+
+def simulate_seasons(strengths, fixture_list=None, seasons=1000, playoff_spots=None, home_advantage=True,
+                     initial_points=None, rng=None, chunk_size=2000):
+    """ simulates many independent seasons of a division
+        It uses the same outcome model as the regular season (see
+        simulation.match_outcome): a home advantage doubles the home strength,
+        luck is a uniform draw up to each strength and the ratio of the two
+        decides a home victory (above 2), an away victory (below 0.5) or a draw.
+        Seasons are simulated as array operations, in chunks to bound memory.
+        Ties in the table are broken randomly.
+
+    :param strengths: list of team strengths
+    :param fixture_list: iterable of (day, home team index, away team index),
+                         a double round robin by default
+    :param seasons: number of seasons
+    :param playoff_spots: number of teams qualifying for the playoffs,
+                          the upper half of the table by default
+    :param home_advantage: True to apply the home advantage to every match
+    :param initial_points: list of points every team already has, e.g. to
+                           forecast the rest of a season
+    :param rng: numpy random Generator
+    :param chunk_size: number of seasons simulated together
+    :return: the forecast
+    :rtype: SeasonForecast
+    """
+    strengths = np.asarray(strengths, dtype=np.float64)
+    team_count = len(strengths)
+    if fixture_list is None:
+        fixture_list = round_robin.fixtures(team_count)
+    if playoff_spots is None:
+        playoff_spots = team_count // 2
+    if initial_points is None:
+        initial_points = np.zeros(team_count, dtype=np.int64)
+    initial_points = np.asarray(initial_points, dtype=np.int64)
+    if rng is None:
+        rng = np.random.default_rng()
+
+    fixture_array = np.asarray([(home, away) for _, home, away in fixture_list], dtype=np.intp).reshape(-1, 2)
+    home, away = fixture_array[:, 0], fixture_array[:, 1]
+    games = np.bincount(home, minlength=team_count) + np.bincount(away, minlength=team_count)
+    max_points = int((initial_points + 3 * games).max()) if team_count else 0
+    home_strength = strengths[home] * (2.0 if home_advantage else 1.0)
+    away_strength = strengths[away]
+    team_idx = np.arange(team_count)
+
+    forecast = SeasonForecast(team_count, max_points)
+    remaining = seasons
+    while remaining > 0:
+        count = min(chunk_size, remaining)
+        remaining -= count
+        # luck factor for every match of every season at once
+        luck1 = rng.random((count, len(home))) * home_strength
+        luck2 = rng.random((count, len(home))) * away_strength
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = luck1 / luck2
+        home_win = ratio > 2
+        away_win = ratio < 0.5
+        draw = ~(home_win | away_win)
+
+        points = np.tile(initial_points, (count, 1))
+        np.add.at(points, (slice(None), home), 3 * home_win + draw)
+        np.add.at(points, (slice(None), away), 3 * away_win + draw)
+
+        # table order: points descending, then a random tie-break
+        table = np.lexsort((rng.random((count, team_count)), -points), axis=1)
+        forecast.positions += np.bincount((table * team_count + team_idx).ravel(),
+                                          minlength=team_count * team_count).reshape(team_count, team_count)
+        forecast.points += np.bincount((team_idx * (max_points + 1) + points).ravel(),
+                                       minlength=team_count * (max_points + 1)).reshape(team_count, max_points + 1)
+        forecast.seasons += count
+
+    forecast.playoffs = forecast.positions[:, 0:playoff_spots].sum(axis=1)
+    return forecast
+
+
+def _simulate_chunk(arguments):
+    """ simulates a chunk of seasons with its own random stream, runs in a worker process """
+    seed_sequence, seasons, kwargs = arguments
+    return simulate_seasons(seasons=seasons, rng=np.random.default_rng(seed_sequence), **kwargs)
+
+
+def _merge(forecasts):
+    """ merges forecasts into the first one """
+    merged = None
+    for forecast in forecasts:
+        if merged is None:
+            merged = forecast
+        else:
+            merged.merge(forecast)
+    return merged
+
+
+def run_forecast(strengths, fixture_list=None, seasons=1000, seed=None, workers=None, chunk_size=2000,
+                 playoff_spots=None, home_advantage=True, initial_points=None):
+    """ simulates many independent seasons of a division across processes
+        Seasons are split into chunks of a fixed size, every chunk gets its
+        own random stream spawned from the master seed and chunks are spread
+        across a pool of worker processes. Since chunks do not depend on the
+        number of workers and their counts are merged by addition, the same
+        seed and chunk_size always give the same forecast, whatever the
+        number of workers. A different chunk_size draws different streams.
+
+    :param strengths: list of team strengths
+    :param fixture_list: iterable of (day, home team index, away team index),
+                         a double round robin by default
+    :param seasons: number of seasons
+    :param seed: master seed, a fresh one is drawn from the OS by default
+    :param workers: number of worker processes, one per CPU by default,
+                    1 runs in the calling process
+    :param chunk_size: number of seasons per chunk, part of the seed
+    :param playoff_spots: number of teams qualifying for the playoffs,
+                          the upper half of the table by default
+    :param home_advantage: True to apply the home advantage to every match
+    :param initial_points: list of points every team already has
+    :return: the forecast, empty for no seasons
+    :rtype: SeasonForecast
+    """
+    if fixture_list is None:
+        fixture_list = round_robin.fixtures(len(strengths))
+    kwargs = {
+        'strengths': list(strengths),
+        'fixture_list': list(fixture_list),
+        'playoff_spots': playoff_spots,
+        'home_advantage': home_advantage,
+        'initial_points': initial_points,
+        'chunk_size': chunk_size,
+    }
+    chunk_seasons = [min(chunk_size, seasons - start) for start in range(0, seasons, chunk_size)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_seasons))
+    chunks = [(seed_sequence, count, kwargs) for seed_sequence, count in zip(seed_sequences, chunk_seasons)]
+
+    if workers == 1:
+        forecast = _merge(map(_simulate_chunk, chunks))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            forecast = _merge(executor.map(_simulate_chunk, chunks))
+
+    if forecast is None:
+        forecast = simulate_seasons(seasons=0, **kwargs)
+    return forecast
@@ -0,0 +1,98 @@
+import functools
+
+# Placeholder used to pad odd team counts, a team paired with it has a bye
+BYE = None
+
+
+def round_count(team_count):
+    """ returns the number of days needed to play one leg
+
+    :param team_count: number of teams
+    :return: number of days per leg
+    :rtype: int
+    """
+    if team_count < 2:
+        return 0
+    return team_count - 1 + team_count % 2
+
+
+@functools.lru_cache(maxsize=128)
+def fixtures(team_count, legs=2):
+    """ returns a round robin fixture list
+        Teams are arranged into a rotating table: the first slot is fixed
+        and all the other slots rotate by one position each day.
+        On every day the team in the first slot plays the team in the second
+        one (alternating home and away), while the remaining slots are paired
+        from the outside in.
+        Odd team counts are padded with a bye, matches against the bye are
+        skipped so the paired team rests that day.
+        Every leg replays the first one with home and away teams swapped on
+        odd legs, e.g. two legs make a regular home and away season.
+
+    :param team_count: number of teams
+    :param legs: number of times every team meets every other team
+    :return: tuple of (day number, home team index, away team index)
+    :rtype: tuple
+    """
+    rounds = round_count(team_count)
+    slots = rounds + 1
+    # the rotating part of the table, the first slot always holds team 0
+    others = list(range(1, team_count)) + [BYE] * (slots - team_count)
+
+    leg = []
+    for day_idx in range(0, rounds):
+        # O(n): read the rotated table instead of shifting it around
+        table = [0] + [others[(position - day_idx) % rounds] for position in range(0, rounds)]
+        if day_idx % 2:
+            pairs = [(table[1], table[0])]
+        else:
+            pairs = [(table[0], table[1])]
+        for match_idx in range(2, slots // 2 + 1):
+            pairs.append((table[match_idx], table[slots - match_idx + 1]))
+        for home, away in pairs:
+            if home is not BYE and away is not BYE:
+                leg.append((day_idx + 1, home, away))
+
+    fixture_list = []
+    for leg_idx in range(0, legs):
+        day_offset = leg_idx * rounds
+        for day_number, home, away in leg:
+            if leg_idx % 2:
+                home, away = away, home
+            fixture_list.append((day_number + day_offset, home, away))
+
+    return tuple(fixture_list)
+
+
+def validate(fixture_list, team_count, legs=2):
+    """ validates a fixture list
+        Checks that no team plays twice on the same day, that every pair of
+        teams meets exactly once per leg and that home and away games are
+        balanced between every pair of teams.
+
+    :param fixture_list: iterable of (day number, home team index, away team index)
+    :param team_count: number of teams
+    :param legs: number of legs the fixture list is expected to cover
+    :return: None
+    :raises ValueError: if the fixture list is not a valid round robin
+    """
+    busy = set()
+    meetings = {}
+    for day_number, home, away in fixture_list:
+        if home == away or not (0 <= home < team_count and 0 <= away < team_count):
+            raise ValueError("invalid match {} vs. {} on day {}".format(home, away, day_number))
+        for team in (home, away):
+            if (day_number, team) in busy:
+                raise ValueError("team {} plays twice on day {}".format(team, day_number))
+            busy.add((day_number, team))
+        meetings[(home, away)] = meetings.get((home, away), 0) + 1
+
+    for home in range(0, team_count):
+        for away in range(home + 1, team_count):
+            first = meetings.get((home, away), 0)
+            second = meetings.get((away, home), 0)
+            if first + second != legs:
+                raise ValueError("teams {} and {} meet {} times instead of {}".format(
+                    home, away, first + second, legs))
+            if abs(first - second) > 1:
+                raise ValueError("teams {} and {} have unbalanced home games".format(home, away))
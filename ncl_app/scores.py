@@ -0,0 +1,94 @@
+import bisect
+import itertools
+import random
+
+# Probability of every score, per match phase and match result
+SCORE_DISTRIBUTIONS = {
+    ('regular_time', '1'): (('1-0', 0.125), ('2-0', 0.090), ('2-1', 0.093), ('3-0', 0.045),
+                            ('4-0', 0.025), ('3-1', 0.045), ('3-2', 0.020), ('4-1', 0.015),
+                            ('5-0', 0.005), ('4-2', 0.007), ('5-1', 0.005), ('6-0', 0.002),
+                            ('4-3', 0.003), ('5-2', 0.001), ('6-1', 0.001), ('7-0', 0.001)),
+    ('regular_time', '2'): (('0-1', 0.065), ('0-2', 0.050), ('1-2', 0.053), ('0-3', 0.015),
+                            ('0-4', 0.015), ('1-3', 0.025), ('2-3', 0.015), ('1-4', 0.010),
+                            ('0-5', 0.003), ('2-4', 0.002), ('1-5', 0.002), ('0-6', 0.001),
+                            ('3-4', 0.002), ('2-5', 0.001), ('1-6', 0.001), ('0-7', 0.001)),
+    ('regular_time', 'X'): (('0-0', 0.085), ('1-1', 0.120), ('2-2', 0.045), ('3-3', 0.007)),
+    ('extra_time', '1'): (('1-0', 0.150), ('2-0', 0.115), ('2-1', 0.110), ('3-0', 0.070)),
+    ('extra_time', '2'): (('0-1', 0.095), ('0-2', 0.075), ('1-2', 0.080), ('0-3', 0.040)),
+    ('extra_time', 'X'): (('0-0', 0.120), ('1-1', 0.145)),
+}
+
+
+def _cumulative_table(distribution):
+    """ returns the scores and their cumulative probabilities """
+    scores = tuple(score for score, _ in distribution)
+    cumulative = tuple(itertools.accumulate(prob for _, prob in distribution))
+    return scores, cumulative
+
+
+# Scores and cumulative probabilities, per match phase and match result
+SCORE_TABLES = dict((key, _cumulative_table(distribution)) for key, distribution in SCORE_DISTRIBUTIONS.items())
+
+
+def generate_score(match_phase, match_result, rng=None):
+    """ generates a score
+        The score is drawn from the distribution of the match phase and
+        result by a binary search over its cumulative probabilities.
+
+    :param match_phase: a string with either regular or extra time
+    :param match_result: a string with 'X' (draw), '1' or '2' (home or away victory)
+    :param rng: random.Random instance, the global random generator by default
+    :return: a string with the score
+    :rtype: str
+    """
+    if rng is None:
+        rng = random
+    scores, cumulative = SCORE_TABLES[(match_phase, match_result)]
+    return scores[min(bisect.bisect_left(cumulative, rng.uniform(0, cumulative[-1])), len(scores) - 1)]
+
+
+def generate_scores(match_phase, match_result, count, rng=None):
+    """ generates many scores for the same match phase and result
+        Scores are the ones count calls to generate_score would draw from
+        the same generator, with the table lookups done once.
+
+    :param match_phase: a string with either regular or extra time
+    :param match_result: a string with 'X' (draw), '1' or '2' (home or away victory)
+    :param count: number of scores
+    :param rng: random.Random instance, the global random generator by default
+    :return: list of strings with the scores
+    :rtype: list
+    """
+    if rng is None:
+        rng = random
+    scores, cumulative = SCORE_TABLES[(match_phase, match_result)]
+    total = cumulative[-1]
+    last = len(scores) - 1
+    uniform = rng.uniform
+    position = bisect.bisect_left
+
+    return [scores[min(position(cumulative, uniform(0, total)), last)] for _ in range(0, count)]
+
+
+def split_score(score):
+    """ splits a score into home and away goals
+
+    :param score: a string with the score, e.g. '2-1'
+    :return: home goals, away goals
+    :rtype: tuple
+    """
+    home_goals, away_goals = score.split('-')
+    return int(home_goals), int(away_goals)
+
+
+def add_scores(score1, score2):
+    """ adds two scores, e.g. regular time and extra time
+
+    :param score1: a string with a score
+    :param score2: a string with a score
+    :return: a string with the total score
+    :rtype: str
+    """
+    home_goals1, away_goals1 = split_score(score1)
+    home_goals2, away_goals2 = split_score(score2)
+    return str(home_goals1 + home_goals2) + '-' + str(away_goals1 + away_goals2)
@@ -0,0 +1,113 @@
+import random
+
+from ncl_app import scores
+
+# Points awarded to the (home team, away team) for each match outcome
+POINTS = {
+    '1': (3, 0),
+    '2': (0, 3),
+    'X': (1, 1),
+}
+
+
+# Columns of a table row, see table_rows
+TABLE_COLUMNS = ('played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against', 'goal_difference', 'points')
+
+
+def table_rows(outcome, score):
+    """ returns what a played match adds to the table rows of its teams
+
+    :param outcome: 'X' (draw), '1' or '2' (home or away victory)
+    :param score: a string with the score
+    :return: home team row, away team row, as dicts of column -> value
+    :rtype: tuple
+    """
+    home_goals, away_goals = scores.split_score(score)
+    home_points, away_points = POINTS[outcome]
+    home_row = {'played': 1, 'wins': int(outcome == '1'), 'draws': int(outcome == 'X'),
+                'losses': int(outcome == '2'), 'goals_for': home_goals, 'goals_against': away_goals,
+                'goal_difference': home_goals - away_goals, 'points': home_points}
+    away_row = {'played': 1, 'wins': int(outcome == '2'), 'draws': int(outcome == 'X'),
+                'losses': int(outcome == '1'), 'goals_for': away_goals, 'goals_against': home_goals,
+                'goal_difference': away_goals - home_goals, 'points': away_points}
+    return home_row, away_row
+
+
+def add_to_table(table, team_id, row):
+    """ adds a row to a team's entry of a table
+
+    :param table: dict of team id -> dict of column -> value
+    :param team_id: team id
+    :param row: dict of column -> value, see table_rows
+    :return: None
+    """
+    team_row = table.setdefault(team_id, dict((column, 0) for column in TABLE_COLUMNS))
+    for column, value in row.items():
+        team_row[column] += value
+
+
+def match_outcome(home_strength, away_strength, home_advantage=True, rng=None):
+    """ decides the outcome of a match
+        First the teams' strengths are gathered,
+        second a home advantage is applied (if needed),
+        third a "luck factor" is computed by drawing random numbers,
+        Now strengths are adjusted according to the above factors and
+        normalized, such that a decision can be taken if the match
+        ended with a home team victory, loss or a draw.
+
+    :param home_strength: strength of the home team
+    :param away_strength: strength of the away team
+    :param home_advantage: True if the home team strength is doubled
+    :param rng: random.Random instance, the global random generator by default
+    :return: 'X' (draw), '1' or '2' (home or away victory)
+    :rtype: str
+    """
+    if rng is None:
+        rng = random
+    # 1) get strengths
+    strength1 = float(home_strength)
+    strength2 = float(away_strength)
+    # 2) apply home advantage
+    if home_advantage:
+        strength1 *= 2
+    # 3) Luck factor
+    strength1 = rng.uniform(0, strength1)
+    strength2 = rng.uniform(0, strength2)
+    # Normalize Strength
+    total_strength = strength1 + strength2
+    rel_strength1 = strength1 / total_strength
+    rel_strength2 = strength2 / total_strength
+    rel_strength_ratio = rel_strength1 / rel_strength2
+    # Take decision
+    if rel_strength_ratio > 2:
+        return '1'
+    elif rel_strength_ratio < 0.5:
+        return '2'
+    else:
+        return 'X'
+
+
+def series_game(home_strength, away_strength, home_advantage=True, rng=None):
+    """ plays a game of a post season series, which cannot end in a draw
+        A draw after regular time goes to extra time, which is decided with
+        the same outcome model and scored with the extra time tables.
+        A draw after extra time is decided by penalties, a coin toss.
+
+    :param home_strength: strength of the home team
+    :param away_strength: strength of the away team
+    :param home_advantage: True if the home team strength is doubled
+    :param rng: random.Random instance, the global random generator by default
+    :return: '1' or '2' (home or away victory), the score
+    :rtype: tuple
+    """
+    if rng is None:
+        rng = random
+    outcome = match_outcome(home_strength, away_strength, home_advantage=home_advantage, rng=rng)
+    score = scores.generate_score('regular_time', outcome, rng=rng)
+    if outcome == 'X':
+        outcome = match_outcome(home_strength, away_strength, home_advantage=home_advantage, rng=rng)
+        score = scores.add_scores(score, scores.generate_score('extra_time', outcome, rng=rng))
+    if outcome == 'X':
+        outcome = rng.choice(('1', '2'))
+
+    return outcome, score
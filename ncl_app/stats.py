@@ -0,0 +1,110 @@
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+import ncl_app.models as models
+from ncl_app import simulation
+
+
+def _home_or_away(home, away):
+    """ returns an expression picking home for the home team's match part and away for the away team's """
+    return Case(When(location='home', then=home), default=away, output_field=IntegerField())
+
+
+def _count(*whens):
+    """ returns an expression counting the match parts matching any of whens """
+    return Sum(Case(*whens, default=Value(0), output_field=IntegerField()))
+
+
+def _won(then):
+    """ returns the conditions of a won match, with the value they give """
+    return [When(location='home', match__outcome='1', then=then),
+            When(location='away', match__outcome='2', then=then)]
+
+
+def _lost(then):
+    """ returns the conditions of a lost match, with the value they give """
+    return [When(location='home', match__outcome='2', then=then),
+            When(location='away', match__outcome='1', then=then)]
+
+
+def table_columns():
+    """ returns the aggregations of the table columns over match parts
+        A match part is a team's side of a match, so every column is a sum
+        over the match parts of the team's played matches, read from the
+        match's outcome and goals. The columns are the same as
+        simulation.table_rows.
+
+    :return: dict of column -> aggregation
+    :rtype: dict
+    """
+    goals_for = _home_or_away(F('match__home_goals'), F('match__away_goals'))
+    goals_against = _home_or_away(F('match__away_goals'), F('match__home_goals'))
+    win_points, _ = simulation.POINTS['1']
+    draw_points, _ = simulation.POINTS['X']
+    return {
+        'played': Count('id'),
+        'wins': _count(*_won(Value(1))),
+        'draws': _count(When(match__outcome='X', then=Value(1))),
+        'losses': _count(*_lost(Value(1))),
+        'goals_for': Sum(goals_for),
+        'goals_against': Sum(goals_against),
+        'goal_difference': Sum(goals_for - goals_against, output_field=IntegerField()),
+        'points': _count(*(_won(Value(win_points)) + [When(match__outcome='X', then=Value(draw_points))])),
+    }
+
+
+def table(group_by, **filters):
+    """ returns the table columns summed over the played matches, one row per group
+        It runs a single SUM / GROUP BY query over the match parts.
+
+    :param group_by: list of match part lookups to group by, e.g. ['team']
+    :param filters: match part filters, e.g. match__day__schedule=schedule
+    :return: list of dicts with the group_by lookups and the table columns
+    :rtype: list
+    """
+    match_parts = models.MatchPart.objects.filter(match__outcome__isnull=False, **filters)
+    return list(match_parts.order_by().values(*group_by).annotate(**table_columns()).order_by(*group_by))
+
+
+def team_table(**filters):
+    """ returns the table columns of every team, see table
+
+    :param filters: match part filters, e.g. match__day__schedule=schedule
+    :return: list of dicts with the team id and the table columns
+    :rtype: list
+    """
+    return table(['team'], **filters)
+
+
+def division_table(**filters):
+    """ returns the table columns summed over the teams of every division, see table
+
+    :param filters: match part filters, e.g. team__division__conference__league=league
+    :return: list of dicts with the division id and the table columns
+    :rtype: list
+    """
+    return table(['team__division'], **filters)
+
+
+def schedule_table(**filters):
+    """ returns the table columns summed over every live schedule, see table
+        Archived seasons are queried with the history module.
+
+    :param filters: match part filters, e.g. team__division__conference__league=league
+    :return: list of dicts with the schedule id and the table columns
+    :rtype: list
+    """
+    return table(['match__day__schedule'], **filters)
+
+
+def goal_totals(**filters):
+    """ returns the number of played matches and their goals, in a single query
+
+    :param filters: match filters, e.g. day__schedule__division__conference__league=league
+    :return: dict with matches, home_goals, away_goals and goals
+    :rtype: dict
+    """
+    matches = models.Match.objects.filter(outcome__isnull=False, **filters)
+    totals = matches.aggregate(matches=Count('id'), home_goals=Sum('home_goals'), away_goals=Sum('away_goals'))
+    totals['home_goals'] = totals['home_goals'] or 0
+    totals['away_goals'] = totals['away_goals'] or 0
+    totals['goals'] = totals['home_goals'] + totals['away_goals']
+    return totals
@@ -1,3 +1,1062 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import ncl_app.models as models
+from ncl_app import api, bulk, caching, export, history, importer, jobs, round_robin, scores, simulation, stats
+
+try:
+    import numpy as np
+    from ncl_app import montecarlo
+except ImportError:
+    # the forecasts require NumPy
+    np = montecarlo = None
+
+# Columns compared between standings
+STANDING_COLUMNS = ('team_id', 'played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against', 'goal_difference',
+                    'points')
+
+
+def create_league(division_sizes, postseason=False, name='League'):
+    """ creates a league with one conference and a division of every size
+
+    :param division_sizes: list of numbers of teams
+    :param postseason: True for a league with a post season
+    :param name: name of the league
+    :return: the league
+    :rtype: League
+    """
+    rng = random.Random(0)
+    league = models.League.objects.create(name=name, postseason=postseason)
+    conference = models.Conference.objects.create(name='Conference', league=league)
+    for division_idx, size in enumerate(division_sizes):
+        division_name = 'Division ' + str(division_idx)
+        schedule = models.Schedule.objects.create(name=division_name)
+        division = models.Division.objects.create(name=division_name, conference=conference, schedule=schedule)
+        models.Team.objects.bulk_create([models.Team(name=division_name + ' Team ' + str(team_idx),
+                                                     strength=round(rng.uniform(0.5, 2), 4), division=division)
+                                         for team_idx in range(size)])
+    return league
+
+
+def play_season(league, seed=1):
+    """ creates and plays a whole season of a league, with its post season
+
+    :param league: a league with a post season
+    :param seed: seed of the random generator
+    :return: None
+    """
+    rng = random.Random(seed)
+    league.create_regular_season()
+    league.play_regular_season_to_end(rng=rng)
+    league.create_post_season()
+    while not league.play_post_season(rng=rng):
+        pass
+
+
+def baseline_fixtures(team_list):
+    """ returns the double round robin of the original rotating table schedule builder
+
+    :param team_list: list of an even number of teams
+    :return: list of (day number, home team, away team)
+    :rtype: list
+    """
+    fixture_list = []
+    rotating_table = dict((team_idx + 1, team) for team_idx, team in enumerate(team_list))
+    swapping = False
+    for day_number in range(1, len(team_list)):
+        for match_idx in range(1, len(team_list) // 2 + 1):
+            if match_idx == 1:
+                team1, team2 = rotating_table[1], rotating_table[2]
+                if swapping:
+                    team1, team2 = team2, team1
+            else:
+                team1 = rotating_table[match_idx + 1]
+                team2 = rotating_table[len(team_list) - match_idx + 2]
+            fixture_list.append((day_number, team1, team2))
+            fixture_list.append((day_number + len(team_list) - 1, team2, team1))
+        swapping = not swapping
+        last = rotating_table[len(team_list)]
+        for entry in range(len(team_list), 2, -1):
+            rotating_table[entry] = rotating_table[entry - 1]
+        rotating_table[2] = last
+    return fixture_list
+
+
+class RoundRobinTests(SimpleTestCase):
+    """ Tests the ORM free fixture lists, see round_robin.fixtures and round_robin.validate """
+
+    def test_even_team_counts_match_the_rotating_table(self):
+        """ even team counts get the fixture list of the original rotating table, every team plays every day """
+        for team_count in (2, 4, 6, 10, 16):
+            fixture_list = round_robin.fixtures(team_count)
+            self.assertEqual(sorted(fixture_list), sorted(baseline_fixtures(list(range(team_count)))))
+            round_robin.validate(fixture_list, team_count)
+
+    def test_odd_team_counts_rest_one_team_a_day(self):
+        """ odd team counts are padded with a bye, so a different team rests on every day of a leg """
+        for team_count in (3, 5, 7, 9):
+            fixture_list = round_robin.fixtures(team_count, legs=1)
+            round_robin.validate(fixture_list, team_count, legs=1)
+            days = round_robin.round_count(team_count)
+            self.assertEqual(days, team_count)
+            resting = []
+            for day_number in range(1, days + 1):
+                playing = set()
+                for _, home, away in [fixture for fixture in fixture_list if fixture[0] == day_number]:
+                    playing.update((home, away))
+                self.assertEqual(len(playing), team_count - 1)
+                resting.extend(set(range(team_count)) - playing)
+            self.assertEqual(sorted(resting), list(range(team_count)))
+
+    def test_legs(self):
+        """ every leg adds a round of days, later legs swap home and away teams """
+        one_leg = round_robin.fixtures(6, legs=1)
+        three_legs = round_robin.fixtures(6, legs=3)
+        round_robin.validate(three_legs, 6, legs=3)
+        self.assertEqual(len(three_legs), 3 * len(one_leg))
+        self.assertEqual(max(fixture[0] for fixture in three_legs), 15)
+        self.assertEqual(three_legs[len(one_leg):2 * len(one_leg)],
+                         tuple((day_number + 5, away, home) for day_number, home, away in one_leg))
+        self.assertEqual(round_robin.fixtures(1), ())
+
+    def test_validate_rejects_broken_fixture_lists(self):
+        """ missing, repeated and unbalanced matches are reported """
+        fixture_list = list(round_robin.fixtures(4))
+        day_number, home, away = fixture_list[0]
+        broken = {
+            'meet 1 times': fixture_list[1:],
+            'plays twice': fixture_list[1:] + [(day_number + 1, home, away)],
+            'invalid match {} vs. {}'.format(home, home): fixture_list[1:] + [(day_number, home, home)],
+            'invalid match {} vs. 4'.format(home): fixture_list[1:] + [(day_number, home, 4)],
+            'unbalanced home games': fixture_list[1:] + [(day_number, away, home)],
+        }
+        for message, fixture_list in broken.items():
+            with self.assertRaisesRegex(ValueError, message):
+                round_robin.validate(fixture_list, 4)
+
+
+@unittest.skipUnless(montecarlo, 'requires NumPy')
+class MonteCarloTests(SimpleTestCase):
+    """ Tests the vectorized season simulator, see montecarlo.simulate_seasons """
+
+    def test_outcomes_follow_the_match_outcome_model(self):
+        """ win, draw and loss rates of a single match are the ones of simulation.match_outcome """
+        rng = random.Random(0)
+        for home_advantage in (True, False):
+            outcomes = [simulation.match_outcome(1.0, 1.5, home_advantage=home_advantage, rng=rng)
+                        for _ in range(20000)]
+            forecast = montecarlo.simulate_seasons([1.0, 1.5], fixture_list=[(1, 0, 1)], seasons=20000,
+                                                   home_advantage=home_advantage, rng=np.random.default_rng(0))
+            home_points = forecast.points[0] / float(forecast.seasons)
+            for points, outcome in ((3, '1'), (1, 'X'), (0, '2')):
+                self.assertAlmostEqual(home_points[points], outcomes.count(outcome) / 20000.0, delta=0.02)
+
+    def test_ties_are_broken_at_random(self):
+        """ teams level on points end in every position equally often """
+        forecast = montecarlo.simulate_seasons([1.0] * 4, fixture_list=[], seasons=20000,
+                                               rng=np.random.default_rng(1))
+        np.testing.assert_allclose(forecast.position_odds(), np.full((4, 4), 0.25), atol=0.02)
+        np.testing.assert_allclose(forecast.playoff_odds(), np.full(4, 0.5), atol=0.02)
+
+    def test_playoff_spots(self):
+        """ exactly playoff_spots teams qualify every season, the best ones first """
+        strengths = [0.5, 1.0, 1.5, 2.0, 1.0, 0.8]
+        for playoff_spots in (1, 2, 5):
+            forecast = montecarlo.simulate_seasons(strengths, seasons=500, playoff_spots=playoff_spots,
+                                                   rng=np.random.default_rng(2))
+            self.assertEqual(forecast.playoffs.sum(), playoff_spots * 500)
+        forecast = montecarlo.simulate_seasons([1.0] * 4, fixture_list=[], seasons=100, playoff_spots=1,
+                                               initial_points=[0, 0, 5, 0], rng=np.random.default_rng(3))
+        self.assertEqual(list(forecast.playoffs), [0, 0, 100, 0])
+        self.assertEqual(list(forecast.expected_points()), [0, 0, 5, 0])
+
+
+@unittest.skipUnless(montecarlo, 'requires NumPy')
+class ForecastTests(SimpleTestCase):
+    """ Tests the reproducible forecasts across processes, see montecarlo.run_forecast """
+
+    def assertSameForecast(self, forecast, other):
+        """ asserts that two forecasts hold the same counts """
+        self.assertEqual(forecast.seasons, other.seasons)
+        np.testing.assert_array_equal(forecast.points, other.points)
+        np.testing.assert_array_equal(forecast.positions, other.positions)
+        np.testing.assert_array_equal(forecast.playoffs, other.playoffs)
+
+    def test_seed_gives_the_same_forecast_for_any_worker_count(self):
+        """ one worker and a pool of workers give identical counts for the same seed and chunks """
+        strengths = [0.5, 1.0, 1.5, 2.0, 1.2, 0.9]
+        forecast = montecarlo.run_forecast(strengths, seasons=1000, seed=11, workers=1, chunk_size=150)
+        self.assertEqual(forecast.seasons, 1000)
+        for workers in (2, 3):
+            self.assertSameForecast(montecarlo.run_forecast(strengths, seasons=1000, seed=11, workers=workers,
+                                                            chunk_size=150), forecast)
+        other_seed = montecarlo.run_forecast(strengths, seasons=1000, seed=12, workers=1, chunk_size=150)
+        self.assertFalse(np.array_equal(other_seed.points, forecast.points))
+
+    def test_chunk_size_is_part_of_the_seed(self):
+        """ a different chunk size simulates as many seasons from different streams """
+        strengths = [0.5, 1.0, 1.5, 2.0]
+        forecast = montecarlo.run_forecast(strengths, seasons=1000, seed=11, workers=1, chunk_size=150)
+        rechunked = montecarlo.run_forecast(strengths, seasons=1000, seed=11, workers=1, chunk_size=400)
+        self.assertEqual(rechunked.seasons, 1000)
+        self.assertEqual(rechunked.playoffs.sum(), forecast.playoffs.sum())
+        self.assertFalse(np.array_equal(rechunked.points, forecast.points))
+
+    def test_no_seasons(self):
+        """ no seasons give an empty forecast of the right shape """
+        forecast = montecarlo.run_forecast([1.0, 1.5, 2.0, 0.5], seasons=0, seed=1, workers=2)
+        self.assertEqual(forecast.seasons, 0)
+        self.assertEqual(forecast.positions.shape, (4, 4))
+        self.assertEqual(forecast.points.shape, (4, 19))
+        self.assertFalse(forecast.points.any() or forecast.positions.any() or forecast.playoffs.any())
+
+
+class RegularSeasonScheduleTests(TestCase):
+    """ Tests the persisted regular season schedule, see Schedule.create_regular_season """
+
+    def test_schedule_keeps_the_rotating_table_order(self):
+        """ days, home and away teams are the ones of the original rotating table """
+        create_league([8])
+        schedule = models.Schedule.objects.get()
+        team_list = list(models.Team.objects.order_by('name'))
+        schedule.create_regular_season(team_list)
+
+        parts = models.MatchPart.objects.filter(match__day__schedule=schedule)
+        teams = {}
+        for match_id, day_number, location, team_id in parts.values_list('match', 'match__day__number',
+                                                                          'location', 'team'):
+            teams.setdefault((match_id, day_number), {})[location] = team_id
+        persisted = sorted((day_number, locations['home'], locations['away'])
+                           for (_, day_number), locations in teams.items())
+        self.assertEqual(persisted, sorted((day_number, home.pk, away.pk)
+                                           for day_number, home, away in baseline_fixtures(team_list)))
+        self.assertEqual(sorted(models.Match.objects.values_list('day__number', 'home_team', 'away_team')),
+                         persisted)
+        self.assertEqual(schedule.day_set.count(), 14)
+
+
+class BulkWriteTests(TestCase):
+    """ Tests the batched writes of played days, see bulk.bulk_update and bulk.bulk_increment """
+
+    def setUp(self):
+        """ creates a league with its regular season """
+        self.league = create_league([6, 4])
+        self.league.create_regular_season()
+        self.rng = random.Random(1)
+
+    def test_played_day_writes_every_match(self):
+        """ every match of a played day gets its outcome, score and goals """
+        self.league.play_regular_season(rng=self.rng)
+        matches = models.Match.objects.filter(day__number=1)
+        self.assertEqual(matches.count(), 5)
+        for match in matches:
+            self.assertIn(match.outcome, ('1', '2', 'X'))
+            self.assertEqual(scores.split_score(match.score), (match.home_goals, match.away_goals))
+        self.assertFalse(models.Match.objects.filter(day__number=2, outcome__isnull=False).exists())
+
+    def test_team_points_match_standings(self):
+        """ the teams' points are the points of their table rows """
+        for _ in range(4):
+            self.league.play_regular_season(rng=self.rng)
+        self.league.play_regular_season_to_end(rng=self.rng)
+        standings = dict(models.Standing.objects.values_list('team_id', 'points'))
+        self.assertEqual(dict(models.Team.objects.values_list('id', 'points')), standings)
+        self.assertTrue(any(standings.values()))
+
+    def test_rebuilt_standings_match_incremental_standings(self):
+        """ rebuilding the tables from the matches gives the incrementally updated rows """
+        for _ in range(5):
+            self.league.play_regular_season(rng=self.rng)
+        for division in models.Division.objects.select_related('schedule'):
+            schedule = division.schedule
+            incremental = sorted(schedule.standing_set.values_list(*STANDING_COLUMNS))
+            schedule.rebuild_standings()
+            self.assertEqual(sorted(schedule.standing_set.values_list(*STANDING_COLUMNS)), incremental)
+
+
+class FastForwardTests(TestCase):
+    """ Tests playing the rest of a regular season at once, see League.play_regular_season_to_end """
+
+    def season_results(self, league):
+        """ returns the matches, tables and playoff flags of a league, keyed by names
+
+        :param league: the league
+        :return: list of matches, list of standings, list of playoff teams
+        :rtype: tuple
+        """
+        matches = models.Match.objects.filter(day__schedule__division__conference__league=league)
+        matches = sorted(matches.values_list('day__number', 'home_team__name', 'away_team__name', 'outcome', 'score'))
+        standings = models.Standing.objects.filter(team__division__conference__league=league)
+        standings = sorted(standings.values_list('team__name', *STANDING_COLUMNS[1:]))
+        playoffs = models.Team.objects.filter(division__conference__league=league, playoffs=True)
+        return matches, standings, sorted(playoffs.values_list('name', flat=True))
+
+    def test_fast_forward_plays_like_day_by_day(self):
+        """ from the same seed, playing the rest of the season at once gives the day by day results """
+        day_by_day = create_league([6, 4], name='Day by day')
+        fast_forward = create_league([6, 4], name='Fast forward')
+        for league in (day_by_day, fast_forward):
+            league.create_regular_season()
+
+        rng = random.Random(7)
+        while not day_by_day.play_regular_season(rng=rng):
+            pass
+        rng = random.Random(7)
+        for _ in range(3):
+            fast_forward.play_regular_season(rng=rng)
+        fast_forward.play_regular_season_to_end(rng=rng)
+
+        expected = self.season_results(day_by_day)
+        self.assertEqual(self.season_results(fast_forward), expected)
+        self.assertEqual(len(expected[0]), 42)
+        self.assertEqual(len(expected[2]), 5)
+        self.assertTrue(fast_forward.schedules_completed)
+
+    def test_fast_forward_queries_do_not_grow_with_the_league(self):
+        """ a 64 team league takes as many queries as a 4 team one """
+        query_counts = []
+        for division_sizes in ([4], [16, 16, 16, 16]):
+            league = create_league(division_sizes, name=str(division_sizes))
+            league.create_regular_season()
+            league.play_regular_season()
+            with CaptureQueriesContext(connection) as queries:
+                league.play_regular_season_to_end()
+            query_counts.append(len(queries))
+            self.assertFalse(models.Match.objects.filter(day__schedule__division__conference__league=league,
+                                                         outcome__isnull=True).exists())
+        self.assertEqual(query_counts[0], query_counts[1])
+
+
+class ScoreTests(TestCase):
+    """ Tests drawing scores from the precomputed tables, see the scores module """
+
+    def test_single_and_batch_draws_agree(self):
+        """ a batch of scores is what as many single draws give from the same seed """
+        for key in scores.SCORE_TABLES:
+            rng = random.Random(3)
+            single = [scores.generate_score(*key, rng=rng) for _ in range(50)]
+            self.assertEqual(scores.generate_scores(*key, count=50, rng=random.Random(3)), single)
+
+    def test_scores_follow_their_distribution(self):
+        """ score frequencies are close to the tabulated probabilities """
+        for key, distribution in scores.SCORE_DISTRIBUTIONS.items():
+            draws = scores.generate_scores(*key, count=20000, rng=random.Random(5))
+            total = sum(prob for _, prob in distribution)
+            for score, prob in distribution:
+                self.assertAlmostEqual(draws.count(score) / 20000, prob / total, delta=0.015, msg=(key, score))
+
+    def test_a_day_draws_its_scores_once_per_result(self):
+        """ playing a day calls generate_scores at most once per result and division """
+        league = create_league([6, 4])
+        league.create_regular_season()
+        with mock.patch.object(scores, 'generate_scores', wraps=scores.generate_scores) as generate_scores:
+            league.play_regular_season(rng=random.Random(1))
+        self.assertLessEqual(generate_scores.call_count, 6)
+        self.assertEqual(sum(call[0][2] for call in generate_scores.call_args_list), 5)
+
+
+class StatsTests(TestCase):
+    """ Tests the tables aggregated in the database, see the stats module """
+
+    def setUp(self):
+        """ creates a league a few days into its regular season """
+        self.league = create_league([6, 4])
+        self.league.create_regular_season()
+        rng = random.Random(4)
+        for _ in range(3):
+            self.league.play_regular_season(rng=rng)
+
+    def test_team_table_matches_the_standings(self):
+        """ the aggregated table of every team is its materialized table row """
+        rows = stats.team_table(team__division__conference__league=self.league)
+        self.assertEqual(len(rows), 10)
+        expected = sorted(models.Standing.objects.values_list(*STANDING_COLUMNS))
+        self.assertEqual(sorted(tuple(row['team'] if column == 'team_id' else row[column]
+                                      for column in STANDING_COLUMNS) for row in rows), expected)
+
+    def test_group_tables(self):
+        """ division and schedule tables add up their teams, a played match is two played table rows """
+        division_rows = stats.division_table(team__division__conference__league=self.league)
+        schedule_rows = stats.schedule_table(team__division__conference__league=self.league)
+        self.assertEqual([row['played'] for row in division_rows], [18, 12])
+        self.assertEqual([row['played'] for row in schedule_rows], [18, 12])
+        for row in division_rows:
+            self.assertEqual(row['wins'], row['losses'])
+            self.assertEqual(row['goals_for'], row['goals_against'])
+            self.assertEqual(row['goal_difference'], 0)
+
+    def test_goal_totals(self):
+        """ matches and goals of the played matches """
+        played = models.Match.objects.filter(outcome__isnull=False)
+        totals = stats.goal_totals(day__schedule__division__conference__league=self.league)
+        self.assertEqual(totals['matches'], 15)
+        self.assertEqual(totals['home_goals'], sum(played.values_list('home_goals', flat=True)))
+        self.assertEqual(totals['away_goals'], sum(played.values_list('away_goals', flat=True)))
+        self.assertEqual(totals['goals'], totals['home_goals'] + totals['away_goals'])
+        division = models.Division.objects.order_by('id').last()
+        self.assertEqual(stats.goal_totals(day__schedule__division=division)['matches'], 6)
+        self.assertEqual(stats.goal_totals(day__schedule__division__conference__league=create_league([4])),
+                         {'matches': 0, 'home_goals': 0, 'away_goals': 0, 'goals': 0})
+
+
+class DivisionScheduleTests(TestCase):
+    """ Tests the regular and post season schedules of a division """
+
+    def test_post_season_schedule_name_fits(self):
+        """ the post season schedule of a division with the longest name gets a name that fits """
+        league = create_league([4], postseason=True)
+        models.Division.objects.update(name='D' * 128)
+        league.create_regular_season()
+        league.play_regular_season_to_end()
+        league.create_post_season()
+        division = models.Division.objects.select_related('schedule', 'post_season_schedule').get()
+        name = division.post_season_schedule.name
+        self.assertEqual(len(name), models.Schedule._meta.get_field('name').max_length)
+        self.assertTrue(name.endswith(models.Division.POST_SEASON_SUFFIX))
+        self.assertEqual(division.post_season_schedule.get_division, division)
+        self.assertEqual(division.schedule.get_division, division)
+
+
+class ScheduleConflictTests(TestCase):
+    """ Tests that a day is never played twice, see Schedule.claim_next_days """
+
+    def test_stale_divisions_cannot_play_the_same_day(self):
+        """ a second request holding the same divisions finds the day already played """
+        league = create_league([6, 4])
+        league.create_regular_season()
+        first = list(models.Division.objects.filter(conference__league=league).select_related('schedule'))
+        second = list(models.Division.objects.filter(conference__league=league).select_related('schedule'))
+
+        models.Division.play_regular_season_schedules(first, rng=random.Random(1))
+        played_matches = models.Match.objects.filter(outcome__isnull=False).order_by('id')
+        played = list(played_matches.values_list('id', 'score'))
+        points = dict(models.Team.objects.values_list('id', 'points'))
+
+        with self.assertRaises(models.ScheduleConflict):
+            models.Division.play_regular_season_schedules(second, rng=random.Random(2))
+        self.assertEqual(list(played_matches.values_list('id', 'score')), played)
+        self.assertEqual(dict(models.Team.objects.values_list('id', 'points')), points)
+        self.assertEqual(sorted(models.Schedule.objects.values_list('current_day', flat=True)), [1, 1])
+
+
+class TeardownTests(TestCase):
+    """ Tests the set-based teardown of seasons, see Schedule.clear_schedules and bulk.bulk_delete """
+
+    def test_reset_leaves_no_rows_behind(self):
+        """ resetting a season with a played post season deletes its whole tree """
+        league = create_league([6, 4], postseason=True)
+        play_season(league)
+        series_matches = models.Series.matches.through.objects
+        self.assertTrue(series_matches.exists())
+        self.assertTrue(models.SeriesPart.objects.exists())
+
+        models.Division.reset_seasons(models.Division.objects.select_related('schedule', 'post_season_schedule'))
+        for model in (models.Day, models.Match, models.MatchPart, models.Series, models.SeriesPart,
+                      models.Standing):
+            self.assertEqual(model.objects.count(), 0, model.__name__)
+        self.assertEqual(series_matches.count(), 0)
+        self.assertEqual(models.Schedule.objects.count(), 2)
+        self.assertFalse(models.Division.objects.filter(post_season_schedule__isnull=False).exists())
+        self.assertFalse(models.Team.objects.exclude(points=0, playoffs=False).exists())
+        self.assertEqual(list(models.Schedule.objects.values_list('current_day', 'completed').distinct()),
+                         [(0, False)])
+
+    def test_delete_out_of_order_fails(self):
+        """ deleting rows before the rows pointing to them raises and leaves every row in place """
+        league = create_league([4])
+        play_season(league)
+        schedule_ids = list(models.Schedule.objects.values_list('pk', flat=True))
+        counts = dict((model, model.objects.count()) for model in (models.Day, models.Match, models.MatchPart))
+
+        with self.assertRaises(IntegrityError):
+            bulk.bulk_delete(models.Day.objects.filter(schedule__in=schedule_ids),
+                             models.Match.objects.filter(day__schedule__in=schedule_ids))
+        for model, count in counts.items():
+            self.assertEqual(model.objects.count(), count, model.__name__)
+
+
+class LeagueLockTests(TestCase):
+    """ Tests the league's simulation lock, see League.lock """
+
+    def setUp(self):
+        """ creates a league """
+        self.league = create_league([4])
+
+    def test_lock_is_exclusive(self):
+        """ the lock cannot be taken twice, and is free again once released """
+        with self.league.lock():
+            with self.assertRaises(models.LeagueLocked):
+                with models.League.objects.get(pk=self.league.pk).lock():
+                    pass
+        with self.league.lock():
+            pass
+        self.assertEqual(models.League.objects.filter(pk=self.league.pk, lock_token='',
+                                                      lock_expires__isnull=True).count(), 1)
+
+    def test_expired_lock_can_be_taken(self):
+        """ a lease whose holder died expires """
+        models.League.objects.filter(pk=self.league.pk).update(
+            lock_token='dead', lock_expires=timezone.now() - datetime.timedelta(seconds=1))
+        with self.league.lock():
+            self.assertNotEqual(models.League.objects.get(pk=self.league.pk).lock_token, 'dead')
+
+    def test_simulate_season_skips_locked_leagues(self):
+        """ the simulate_season command leaves a locked league alone """
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with self.league.lock():
+            call_command('simulate_season', str(self.league.pk), create=True, stdout=stdout, stderr=stderr)
+        self.assertIn('skipped', stderr.getvalue())
+        self.assertFalse(models.Match.objects.exists())
+
+        call_command('simulate_season', str(self.league.pk), create=True, stdout=stdout, stderr=stderr)
+        self.assertIn('completed', stdout.getvalue())
+        self.assertFalse(models.Match.objects.filter(outcome__isnull=True).exists())
+
+
+class LeagueVersionTests(TestCase):
+    """ Tests that every change moves a league to a new version, see League.changed """
+
+    def setUp(self):
+        """ creates a league with its regular season """
+        self.league = create_league([4])
+        self.league.create_regular_season()
+        self.team = models.Team.objects.order_by('id').first()
+
+    def version(self):
+        """ returns the league's version """
+        return models.League.objects.get(pk=self.league.pk).version
+
+    def test_saved_and_deleted_instances_change_the_version(self):
+        """ save() and delete() stamp the league of the instance """
+        for instance in (self.league, self.league.conference_set.get(), self.team.division, self.team,
+                         self.team.division.schedule):
+            version = self.version()
+            instance.save()
+            self.assertGreater(self.version(), version, type(instance).__name__)
+        version = self.version()
+        models.Team.objects.create(name='New team', strength=1, division=self.team.division).delete()
+        self.assertGreater(self.version(), version)
+
+    def test_deleted_schedule_changes_the_version(self):
+        """ a deleted schedule stamps the league through the division it takes along """
+        version = self.version()
+        self.team.division.schedule.delete()
+        self.assertGreater(self.version(), version)
+        self.assertFalse(models.Division.objects.exists())
+
+    def test_saved_match_costs_no_extra_query(self):
+        """ days and matches are written by the schedules, their save() only writes the row """
+        match = models.Match.objects.first()
+        with self.assertNumQueries(1):
+            match.save()
+
+    def test_admin_edits_of_days_and_matches_change_the_version(self):
+        """ the admin stamps the league of the days and matches it saves or deletes """
+        for instance in (models.Match.objects.first(), models.Day.objects.first()):
+            model_admin = admin.site._registry[type(instance)]
+            version = self.version()
+            model_admin.save_model(None, instance, None, True)
+            self.assertGreater(self.version(), version, type(instance).__name__)
+            version = self.version()
+            model_admin.delete_model(None, instance)
+            self.assertGreater(self.version(), version, type(instance).__name__)
+
+    def test_saving_a_stale_league_keeps_its_state(self):
+        """ a stale instance neither moves the version back nor releases a lock """
+        stale = models.League.objects.get(pk=self.league.pk)
+        with self.league.lock():
+            version = self.version()
+            stale.name = 'Renamed'
+            stale.save()
+            league = models.League.objects.get(pk=self.league.pk)
+            self.assertEqual(league.name, 'Renamed')
+            self.assertGreater(league.version, version)
+            self.assertNotEqual(league.lock_token, '')
+
+    def test_renamed_team_is_not_served_from_cache(self):
+        """ a page cached or validated before a save() is rendered again """
+        response = self.client.get('/ncl_app/regular_season/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.team.name)
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/ncl_app/regular_season/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.team.name = 'Renamed'
+        self.team.save()
+        response = self.client.get('/ncl_app/regular_season/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Renamed')
+
+
+class LeaguePageQueryTests(TestCase):
+    """ Tests that the league pages load with a fixed number of queries, see loaders.league_queryset """
+
+    # queries of every page, rendered from the database
+    PAGE_QUERIES = (
+        ('/ncl_app/', 4),
+        ('/ncl_app/regular_season/', 6),
+        ('/ncl_app/regular_season_day/', 7),
+        ('/ncl_app/regular_season_over/', 5),
+        ('/ncl_app/post_season_day/', 1),
+    )
+
+    def setUp(self):
+        """ creates a league of two divisions of different sizes, one day into its regular season """
+        self.create_league([6, 4], 'League')
+
+    def create_league(self, division_sizes, name):
+        """ creates a league one day into its regular season and empties the page cache """
+        league = create_league(division_sizes, postseason=True, name=name)
+        league.create_regular_season()
+        league.play_regular_season(rng=random.Random(1))
+        caching.get_cache().clear()
+
+    def assertPageQueries(self):
+        """ asserts the queries of every page """
+        for path, queries in self.PAGE_QUERIES:
+            with self.assertNumQueries(queries):
+                self.assertEqual(self.client.get(path).status_code, 200)
+
+    def test_pages_do_not_query_per_division(self):
+        """ more leagues, divisions, teams and matches take the same queries """
+        self.assertPageQueries()
+        self.create_league([8, 6, 4], 'Bigger league')
+        self.assertPageQueries()
+
+    def test_cached_pages_only_read_the_versions(self):
+        """ pages of unchanged leagues come from the cache """
+        self.assertPageQueries()
+        for path, _ in self.PAGE_QUERIES[1:4]:
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(path).status_code, 200)
+
+
+class ApiTests(TestCase):
+    """ Tests the read-only JSON API, see the api module """
+
+    def setUp(self):
+        """ creates a league with an archived season, one day into its next season """
+        self.league = create_league([6, 4], postseason=True)
+        play_season(self.league)
+        self.league.create_regular_season()
+        self.league.play_regular_season(rng=random.Random(3))
+        self.division = models.Division.objects.select_related('schedule').order_by('id').first()
+        self.team = self.division.team_set.order_by('id').first()
+
+    def get(self, path, status=200, **params):
+        """ returns the payload of a GET request, after checking its status """
+        response = self.client.get('/ncl_app/api/' + path, params)
+        self.assertEqual(response.status_code, status, response.content)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return response.json()
+
+    def test_leagues(self):
+        """ leagues are listed with every field, or the selected ones """
+        payload = self.get('leagues/')
+        self.assertEqual((payload['count'], payload['page'], payload['pages']), (1, 1, 1))
+        self.assertEqual(sorted(payload['results'][0]), sorted(name for name, _ in api.LEAGUE_FIELDS))
+        self.assertEqual(payload['results'][0]['name'], 'League')
+        payload = self.get('leagues/', fields='name,id')
+        self.assertEqual(payload['results'], [{'id': self.league.pk, 'name': 'League'}])
+        self.assertEqual(self.client.post('/ncl_app/api/leagues/').status_code, 405)
+
+    def test_unknown_fields(self):
+        """ unknown fields are a 400 naming the available ones """
+        payload = self.get('leagues/', status=400, fields='id,colour')
+        self.assertEqual(payload['error'],
+                         'Unknown field(s): colour. Available: id, name, postseason, version, modified')
+
+    def test_pagination(self):
+        """ pages are numbered from 1, bad page numbers are a 400 or a 404 """
+        schedule_id = self.division.schedule_id
+        payload = self.get('schedules/{}/matches/'.format(schedule_id), page_size=7, page=2, fields='id')
+        self.assertEqual((payload['count'], payload['page'], payload['pages']), (30, 2, 5))
+        self.assertEqual(len(payload['results']), 7)
+        self.assertEqual(self.get('schedules/{}/matches/'.format(schedule_id), status=404, page=6)['error'],
+                         'That page contains no results')
+        self.assertEqual(self.get('leagues/', status=400, page='last')['error'], 'page must be an integer')
+        self.assertEqual(self.get('leagues/', status=400, page_size=0)['error'], 'page_size must be positive')
+        with mock.patch.object(api, 'MAX_PAGE_SIZE', 4):
+            payload = self.get('schedules/{}/matches/'.format(schedule_id), page_size=1000)
+        self.assertEqual((len(payload['results']), payload['pages']), (4, 8))
+
+    def test_matches(self):
+        """ the matches of a schedule by day, played or not """
+        path = 'schedules/{}/matches/'.format(self.division.schedule_id)
+        played = self.get(path, played=1)
+        self.assertEqual(played['count'], 3)
+        for match in played['results']:
+            self.assertEqual(match['day'], 1)
+            self.assertEqual(match['score'], '{}-{}'.format(match['home_goals'], match['away_goals']))
+        self.assertEqual(self.get(path, played=0)['count'], 27)
+        day = self.get(path, day=4, fields='day,home_team,away_team')
+        self.assertEqual([match['day'] for match in day['results']], [4, 4, 4])
+        self.assertEqual(self.get(path, status=400, day='x')['error'], 'day must be an integer')
+
+    def test_missing_objects(self):
+        """ missing objects are a 404 with an error body """
+        for path in ('schedules/0/matches/', 'divisions/0/teams/', 'teams/0/history/', 'seasons/0/standings/'):
+            self.assertIn('error', self.get(path, status=404))
+
+    def test_decimal_strength(self):
+        """ strengths keep their decimals, as strings """
+        teams = self.get('divisions/{}/teams/'.format(self.division.pk))['results']
+        self.assertEqual([team['strength'] for team in teams],
+                         [str(strength) for strength in self.division.team_set.order_by('id')
+                          .values_list('strength', flat=True)])
+        self.assertIsInstance(teams[0]['strength'], str)
+
+    def test_team_history(self):
+        """ the archived table rows of a team and their totals """
+        payload = self.get('teams/{}/history/'.format(self.team.pk))
+        self.assertEqual(payload['count'], 1)
+        row = payload['results'][0]
+        standing = models.ArchivedStanding.objects.get(team=self.team)
+        self.assertEqual((row['season'], row['team_id'], row['points'], row['position']),
+                         (1, self.team.pk, standing.points, standing.position))
+        self.assertEqual(payload['record']['points'], standing.points)
+        self.assertEqual(payload['record']['seasons'], 1)
+        season = models.Season.objects.get()
+        self.assertEqual(self.get('seasons/{}/matches/'.format(season.pk), status=400, stage='Q')['error'],
+                         'stage must be one of R, P')
+
+
+class ImporterTests(TestCase):
+    """ Tests the bulk league import, see the importer module """
+
+    # a league of two conferences, one of two divisions
+    DEFINITION = {'name': 'NCL', 'postseason': True, 'conferences': [
+        {'name': 'East', 'divisions': [
+            {'name': 'Atlantic', 'teams': [{'name': 'Boston', 'strength': 1.25}, {'name': 'Miami', 'strength': '0.8'}]},
+            {'name': 'Central', 'teams': [{'name': 'Chicago', 'strength': 2}, {'name': 'Detroit', 'strength': 1},
+                                          {'name': 'Toronto', 'strength': 1.12345}]}]},
+        {'name': 'West', 'divisions': [
+            {'name': 'Pacific', 'teams': [{'name': 'Seattle', 'strength': 1.5}, {'name': 'Denver', 'strength': 1}]}]},
+    ]}
+
+    def assertImported(self, league):
+        """ asserts that a league was created as DEFINITION """
+        league = models.League.objects.get(pk=league.pk)
+        self.assertEqual((league.name, league.postseason), ('NCL', True))
+        divisions = models.Division.objects.filter(conference__league=league).select_related('conference', 'schedule')
+        self.assertEqual(sorted((division.conference.name, division.name, division.schedule.name)
+                                for division in divisions),
+                         [('East', 'Atlantic', 'Atlantic'), ('East', 'Central', 'Central'),
+                          ('West', 'Pacific', 'Pacific')])
+        teams = models.Team.objects.filter(division__conference__league=league)
+        self.assertEqual(dict(teams.values_list('name', 'division__name')),
+                         {'Boston': 'Atlantic', 'Miami': 'Atlantic', 'Chicago': 'Central', 'Detroit': 'Central',
+                          'Toronto': 'Central', 'Seattle': 'Pacific', 'Denver': 'Pacific'})
+        self.assertEqual(str(teams.get(name='Toronto').strength), '1.1234')
+
+    def test_import_json(self):
+        """ a JSON definition creates the whole hierarchy, every division with its schedule """
+        leagues = importer.import_text(json.dumps({'leagues': [self.DEFINITION]}), 'json')
+        self.assertEqual(len(leagues), 1)
+        self.assertImported(leagues[0])
+        leagues[0].create_regular_season()
+        self.assertEqual(models.Match.objects.count(), 2 + 6 + 2)
+
+    def test_rows_inserted_alongside_are_not_taken_for_new_ones(self):
+        """ leagues and schedules inserted by someone else during the import keep their own rows """
+        models.League.objects.create(name='NCL')
+        real_bulk_creates = {}
+
+        def interleave(model, name):
+            real_bulk_creates[model] = model.objects.bulk_create
+
+            def bulk_create(objs, *args, **kwargs):
+                model.objects.create(name=name)
+                return real_bulk_creates[model](objs, *args, **kwargs)
+            return mock.patch.object(model.objects, 'bulk_create', bulk_create)
+
+        with interleave(models.League, 'NCL'), interleave(models.Schedule, 'Atlantic'):
+            league = importer.import_leagues([self.DEFINITION])[0]
+        self.assertImported(league)
+        self.assertEqual(models.League.objects.filter(name='NCL').count(), 3)
+        self.assertEqual(models.Schedule.objects.filter(name='Atlantic', division__isnull=True).count(), 1)
+
+    def test_import_csv(self):
+        """ CSV rows are grouped into leagues, conferences and divisions """
+        rows = ['league,conference,division,team,strength,postseason']
+        for conference in self.DEFINITION['conferences']:
+            for division in conference['divisions']:
+                for team in division['teams']:
+                    rows.append(','.join(('NCL', conference['name'], division['name'], team['name'],
+                                          str(team['strength']), 'true')))
+        rows.extend(['Other,Only,Division,First,1,', 'Other,Only,Division,Second,1,'])
+        leagues = importer.import_text('\n'.join(rows), 'csv')
+        self.assertEqual([league.name for league in leagues], ['NCL', 'Other'])
+        self.assertImported(leagues[0])
+        self.assertFalse(models.League.objects.get(name='Other').postseason)
+
+        with self.assertRaisesRegex(importer.DefinitionError, 'Missing CSV column\\(s\\): strength'):
+            importer.parse('league,conference,division,team\nNCL,East,Atlantic,Boston', 'csv')
+
+    def test_import_command(self):
+        """ the import_leagues command imports the files it is given """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ncl.json')
+            with open(path, 'w') as definition:
+                json.dump(self.DEFINITION, definition)
+            out = io.StringIO()
+            call_command('import_leagues', path, stdout=out)
+        league = models.League.objects.get()
+        self.assertImported(league)
+        self.assertIn('League NCL created (id ' + str(league.pk) + ')', out.getvalue())
+
+    def test_invalid_definitions_report_every_problem(self):
+        """ duplicate names, missing children and bad strengths are all reported, nothing is created """
+        definition = json.loads(json.dumps(self.DEFINITION))
+        east, west = definition['conferences']
+        east['divisions'][1]['name'] = 'Atlantic'
+        east['divisions'][0]['teams'][1]['name'] = 'Boston'
+        east['divisions'][1]['teams'][0]['strength'] = 0
+        west['divisions'][0]['teams'] = west['divisions'][0]['teams'][0:1]
+        definition['conferences'].append({'name': 'North', 'divisions': []})
+        with self.assertRaises(importer.DefinitionError) as raised:
+            importer.import_leagues([definition, {'conferences': []}])
+        self.assertEqual(raised.exception.errors, [
+            'league NCL / East / Atlantic / team: duplicate name Boston',
+            'league NCL / East / division: duplicate name Atlantic',
+            'league NCL / East / Atlantic / Chicago: strength must be a number between 0 and 1000',
+            'league NCL / West / Pacific: at least two teams are needed',
+            'league NCL / North: no divisions',
+            'league 2: missing name',
+            'league 2: no conferences',
+        ])
+        self.assertFalse(models.League.objects.exists() or models.Schedule.objects.exists())
+
+
+class PostSeasonTests(TestCase):
+    """ Tests the creation of the post season """
+
+    def test_post_season_waits_for_every_division(self):
+        """ divisions of different sizes all finish their regular season before the post season """
+        league = create_league([8, 4], postseason=True)
+        league.create_regular_season()
+        days = 0
+        while not league.in_post_season:
+            days += 1
+            self.assertLessEqual(days, 15)
+            jobs.perform(league, 'play_regular_season', days, lambda done, total: None)
+            if days == 7:
+                # the division of four teams is over, the other one is not
+                self.assertFalse(league.in_post_season)
+                self.assertEqual(sorted(models.Schedule.objects.values_list('completed', flat=True)),
+                                 [False, True])
+
+        self.assertEqual(days, 15)
+        self.assertFalse(models.Match.objects.filter(day__schedule__division__isnull=False,
+                                                     outcome__isnull=True).exists())
+        for division in models.Division.objects.all():
+            self.assertEqual(division.team_set.filter(playoffs=True).count(), division.team_set.count() // 2)
+
+    def test_series_are_seeded_in_table_order(self):
+        """ teams tied on points are seeded by goal difference, as in the table """
+        league = create_league([4], postseason=True)
+        league.create_regular_season()
+        division = models.Division.objects.select_related('schedule').get()
+        teams = list(division.team_set.order_by('id'))
+        # every team on the same points, the table is the reverse of the teams' order
+        for goal_difference, team in enumerate(teams):
+            models.Standing.objects.filter(team=team).update(points=6, goal_difference=goal_difference)
+        models.Team.objects.update(points=6)
+        models.Division.set_playoff_teams([division])
+        division.create_post_season_schedule()
+
+        table = [standing.team_id for standing in division.schedule.sorted_standing_set]
+        self.assertEqual(table, [team.pk for team in reversed(teams)])
+        series = division.post_season_schedule.series_set.order_by('id')
+        self.assertEqual([(item.lead_team.pk, item.non_lead_team.pk) for item in series],
+                         [(table[0], table[1]), (table[2], table[3])])
+
+
+class PostSeasonPlayTests(TestCase):
+    """ Tests playing the post season series, see Schedule.play_post_season_days """
+
+    def setUp(self):
+        """ creates a league at the start of its post season """
+        self.league = create_league([8, 6], postseason=True)
+        self.league.create_regular_season()
+        self.league.play_regular_season_to_end(rng=random.Random(1))
+        self.league.create_post_season()
+        self.rng = random.Random(2)
+
+    def play_post_season(self):
+        """ plays the post season to its end
+
+        :return: number of days played
+        :rtype: int
+        """
+        days = 0
+        while not self.league.play_post_season(rng=self.rng):
+            days += 1
+            self.assertLessEqual(days, 3)
+        return days + 1
+
+    def played_games(self, series):
+        """ returns the played games of a series in playing order """
+        return list(series.matches.filter(outcome__isnull=False).order_by('day__number'))
+
+    def assertSeriesPlayed(self, series):
+        """ asserts that a series was played to wins_needed, the lead team hosting the odd games """
+        games = self.played_games(series)
+        wins = series.wins()
+        self.assertEqual(max(wins.values()), series.wins_needed)
+        self.assertLess(min(wins.values()), series.wins_needed)
+        self.assertEqual(len(games), sum(wins.values()))
+        for game_idx, game in enumerate(games):
+            lead_hosts = game_idx % 2 == 0
+            self.assertEqual(game.home_team_id, (series.lead_team if lead_hosts else series.non_lead_team).pk)
+            parts = dict(game.matchpart_set.values_list('location', 'team'))
+            self.assertEqual(parts, {'home': game.home_team_id, 'away': game.away_team_id})
+            self.assertIn(game.outcome, ('1', '2'))
+
+    def test_series_stop_at_wins_needed(self):
+        """ every series ends once a team has won two games, the lead team hosting the odd games """
+        self.play_post_season()
+        series_list = models.Series.objects.all()
+        self.assertEqual(len(series_list), 6)
+        for series in series_list:
+            self.assertSeriesPlayed(series)
+        matches = models.Match.objects.count()
+        self.assertTrue(self.league.play_post_season(rng=self.rng))
+        self.assertEqual(models.Match.objects.count(), matches)
+
+    def test_only_played_games_are_written(self):
+        """ a post season day writes one played game per open series and nothing else """
+        post_season = models.Match.objects.filter(day__schedule__post_season_division__isnull=False)
+        self.assertFalse(post_season.exists())
+        self.league.play_post_season(rng=self.rng)
+        self.assertEqual(post_season.count(), 6)
+        self.assertFalse(post_season.filter(outcome__isnull=True).exists())
+        self.play_post_season()
+        self.assertFalse(post_season.filter(outcome__isnull=True).exists())
+        self.assertEqual(models.MatchPart.objects.filter(match__in=post_season).count(), 2 * post_season.count())
+
+    def test_series_with_unplayed_games(self):
+        """ series whose games were all created up front, as the first post season code did, play the same way """
+        schedules = models.Schedule.objects.filter(post_season_division__isnull=False)
+        for series in models.Series.objects.filter(schedule__in=schedules):
+            lead_team, non_lead_team = series.lead_team, series.non_lead_team
+            for day_number in range(1, series.length + 1):
+                day, _ = models.Day.objects.get_or_create(schedule_id=series.schedule_id, number=day_number)
+                home_team, away_team = (lead_team, non_lead_team) if day_number % 2 else (non_lead_team, lead_team)
+                match = models.Match.objects.create(day=day, home_team=home_team, away_team=away_team)
+                models.MatchPart.objects.create(match=match, team=home_team, location='home')
+                models.MatchPart.objects.create(match=match, team=away_team, location='away')
+                series.matches.add(match)
+        self.play_post_season()
+        for series in models.Series.objects.all():
+            self.assertSeriesPlayed(series)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite syntax')
+class ScheduleIndexTests(TestCase):
+    """ Tests that the schedule lookups use their composite indexes """
+
+    def assertUsesIndex(self, queryset, columns):
+        """ asserts that the query plan of queryset searches the index of the given columns """
+        table = queryset.model._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+            names = [name for name, constraint in constraints.items() if constraint['columns'] == list(columns)]
+            self.assertTrue(names, 'no index on ' + table + ' ' + str(columns))
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertTrue(any('INDEX ' + name in plan for name in names), plan)
+
+    def test_lookups_use_composite_indexes(self):
+        """ Day by (schedule, number), MatchPart by (match, location), SeriesPart by (series, lead) and
+            Division by schedule
+        """
+        self.assertUsesIndex(models.Day.objects.filter(schedule=1, number=2), ('schedule_id', 'number'))
+        self.assertUsesIndex(models.MatchPart.objects.filter(match=1, location='home'), ('match_id', 'location'))
+        self.assertUsesIndex(models.SeriesPart.objects.filter(series=1, lead=True), ('series_id', 'lead'))
+        self.assertUsesIndex(models.Division.objects.filter(schedule=1), ('schedule_id',))
+
+
+class SeasonArchiveTests(TestCase):
+    """ Tests the archiving of completed seasons, see League.archive_season """
+
+    def setUp(self):
+        """ creates a league with a post season """
+        self.league = create_league([6, 4], postseason=True)
+
+    def test_archive_moves_the_season_out_of_the_live_tables(self):
+        """ the live tables are emptied, the history tables get every played match and table row """
+        play_season(self.league)
+        played = models.Match.objects.filter(outcome__isnull=False)
+        regular_matches = played.filter(day__schedule__division__isnull=False).count()
+        post_season_matches = played.filter(day__schedule__post_season_division__isnull=False).count()
+        standings = list(models.Standing.objects.order_by('team').values_list('team_id', 'points'))
+        self.assertTrue(regular_matches and post_season_matches)
+
+        season = self.league.archive_season(chunk_size=7)
+        self.assertEqual(season.number, 1)
+        for model in (models.Day, models.Match, models.MatchPart, models.Series, models.SeriesPart,
+                      models.Standing):
+            self.assertEqual(model.objects.count(), 0, model.__name__)
+        self.assertEqual(models.Series.matches.through.objects.count(), 0)
+        archived = models.ArchivedMatch.objects.filter(season=season)
+        self.assertEqual(archived.filter(stage=models.ArchivedMatch.REGULAR_SEASON).count(), regular_matches)
+        self.assertEqual(archived.filter(stage=models.ArchivedMatch.POST_SEASON).count(), post_season_matches)
+        self.assertEqual(list(season.archivedstanding_set.order_by('team').values_list('team_id', 'points')),
+                         standings)
+        self.assertEqual(sorted(season.archivedstanding_set.filter(position=1).values_list('division', flat=True)),
+                         sorted(models.Division.objects.values_list('id', flat=True)))
+
+    def test_incomplete_season_is_not_archived(self):
+        """ a season still being played stays in the live tables """
+        self.league.create_regular_season()
+        self.league.play_regular_season(rng=random.Random(1))
+        matches = models.Match.objects.count()
+        self.assertIsNone(self.league.archive_season())
+        self.assertEqual(models.Match.objects.count(), matches)
+        self.assertFalse(models.Season.objects.exists())
+
+    def test_new_season_archives_the_completed_one(self):
+        """ history is grouped per season and per division, and exported with the live season """
+        for seed in (1, 2):
+            play_season(self.league, seed=seed)
+        self.league.create_regular_season()
+        seasons = list(history.seasons(self.league))
+        self.assertEqual([season.number for season in seasons], [1, 2])
+        self.assertEqual(models.Match.objects.filter(outcome__isnull=True).count(), models.Match.objects.count())
+
+        season_rows = history.season_table(season__league=self.league)
+        self.assertEqual([row['season'] for row in season_rows], [season.pk for season in seasons])
+        for row, season in zip(season_rows, seasons):
+            standings = models.ArchivedStanding.objects.filter(season=season)
+            self.assertEqual(row['points'], sum(standings.values_list('points', flat=True)))
+            self.assertEqual(row['titles'], 2)
+            self.assertEqual(row['wins'], row['losses'])
+        division_rows = history.division_table(season__league=self.league)
+        self.assertEqual([row['seasons'] for row in division_rows], [2, 2])
+        self.assertEqual(sum(row['played'] for row in division_rows), sum(row['played'] for row in season_rows))
+        goals = history.goal_totals(['season'], season__league=self.league)
+        self.assertEqual(sum(row['matches'] for row in goals), models.ArchivedMatch.objects.count())
+        self.assertEqual(sum(row['goals'] for row in goals),
+                         sum(home + away for home, away in
+                             models.ArchivedMatch.objects.values_list('home_goals', 'away_goals')))
+
+        record_types = [record['record'] for record in export.records(self.league, chunk_size=5)]
+        self.assertEqual(record_types.count('season'), 2)
+        self.assertEqual(record_types.count('archived_match'), models.ArchivedMatch.objects.count())
+        self.assertEqual(record_types.count('archived_standing'), models.ArchivedStanding.objects.count())
+        self.assertEqual(record_types.count('match'), models.Match.objects.count())
+        self.assertEqual(len(list(export.csv_lines(export.records(self.league)))), len(record_types) + 1)
@@ -1,5 +1,5 @@
 from django.conf.urls import url
-from . import views
+from . import api, views
 
 app_name = 'ncl_app'
 urlpatterns = [
@@ -8,9 +8,24 @@ urlpatterns = [
     url(r'^(?P<pk>[0-9]+)/create_regular_season/$', views.create_regular_season, name='create_regular_season'),
     url(r'^regular_season_day/$', views.RegularSeasonDayView.as_view(), name='regular_season_day'),
     url(r'^(?P<pk>[0-9]+)/play_regular_season/$', views.play_regular_season, name='play_regular_season'),
+    url(r'^(?P<pk>[0-9]+)/play_regular_season_to_end/$', views.play_regular_season_to_end,
+        name='play_regular_season_to_end'),
     url(r'^regular_season_over/$', views.RegularSeasonOverView.as_view(), name='regular_season_over'),
+    url(r'^(?P<pk>[0-9]+)/create_post_season/$', views.create_post_season, name='create_post_season'),
     url(r'^post_season/$', views.PostSeasonView.as_view(), name='post_season'),
     url(r'^(?P<pk>[0-9]+)/play_post_season/$', views.play_post_season, name='play_post_season'),
     url(r'^post_season_day/$', views.PostSeasonDayView.as_view(), name='post_season_day'),
     url(r'^post_season_over/$', views.PostSeasonOverView.as_view(), name='post_season_over'),
+    url(r'^(?P<pk>[0-9]+)/export\.(?P<export_format>[a-z]+)$', views.export_league, name='export_league'),
+    url(r'^jobs/(?P<pk>[0-9]+)/$', views.job_status, name='job_status'),
+    url(r'^api/leagues/$', api.leagues, name='api_leagues'),
+    url(r'^api/leagues/(?P<pk>[0-9]+)/divisions/$', api.divisions, name='api_divisions'),
+    url(r'^api/divisions/(?P<pk>[0-9]+)/teams/$', api.teams, name='api_teams'),
+    url(r'^api/schedules/(?P<pk>[0-9]+)/days/$', api.days, name='api_days'),
+    url(r'^api/schedules/(?P<pk>[0-9]+)/matches/$', api.matches, name='api_matches'),
+    url(r'^api/schedules/(?P<pk>[0-9]+)/standings/$', api.standings, name='api_standings'),
+    url(r'^api/leagues/(?P<pk>[0-9]+)/seasons/$', api.seasons, name='api_seasons'),
+    url(r'^api/seasons/(?P<pk>[0-9]+)/standings/$', api.season_standings, name='api_season_standings'),
+    url(r'^api/seasons/(?P<pk>[0-9]+)/matches/$', api.season_matches, name='api_season_matches'),
+    url(r'^api/teams/(?P<pk>[0-9]+)/history/$', api.team_history, name='api_team_history'),
 ]
@@ -1,54 +1,168 @@
+import hashlib
+
+from django.conf import settings
 from django.shortcuts import get_object_or_404, render
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition, require_POST
 import ncl_app.models as models
+from ncl_app import export, jobs, loaders
 
 # Create your views here.
 
 
-def create_regular_season(request, pk):
-    """ Handles regular season creation 
+def conflict(message):
+    """ returns a 409 response, the request can be retried later
+    """
+    return HttpResponse(message, status=409, content_type='text/plain')
+
+
+def posted_day(request):
+    """ returns the day a play request expects to play, if given
+    """
+    try:
+        return int(request.POST['day'])
+    except (KeyError, ValueError):
+        return None
+
+
+def league_operation(request, pk, operation, result):
+    """ Runs a league operation, or queues it when background jobs are enabled
+        Play forms post the day they expect to play: if that day has already
+        been played, e.g. a retried or double submitted request, nothing is
+        played again (see jobs.perform).
+
+    :param request: the POST request
+    :param pk: id of the league
+    :param operation: name of the operation, see jobs.OPERATIONS
+    :param result: function returning the response once the operation is done
+    :return: the response
     """
     league = get_object_or_404(models.League, pk=pk)
-    league.create_regular_season()
+    day = posted_day(request)
+    if getattr(settings, 'NCL_BACKGROUND_JOBS', False):
+        job = jobs.enqueue(league, operation, day=day)
+        response = JsonResponse(job.as_dict(), status=202)
+        response['Location'] = reverse('ncl_app:job_status', args=(job.pk,))
+        return response
+    try:
+        jobs.perform(league, operation, day=day)
+    except (models.LeagueLocked, models.ScheduleConflict) as e:
+        return conflict(str(e))
     # Always return an HttpResponseRedirect after successfully dealing
     # with POST data. This prevents data from being posted twice if a
     # user hits the Back button.
-    return HttpResponseRedirect(reverse('ncl_app:regular_season'))
+    return result(league)
+
+
+@require_POST
+def create_regular_season(request, pk):
+    """ Handles regular season creation 
+    """
+    return league_operation(request, pk, 'create_regular_season',
+                            lambda league: HttpResponseRedirect(reverse('ncl_app:regular_season')))
 
 
+@require_POST
 def play_regular_season(request, pk):
     """ Handles regular season games
+        The post season is created once the regular season is completed.
     """
-    league = get_object_or_404(models.League, pk=pk)
-    completed = league.play_regular_season()
-    # Always return an HttpResponseRedirect after successfully dealing
-    # with POST data. This prevents data from being posted twice if a
-    # user hits the Back button.
-    if completed:
-        if league.postseason:
-            league.create_post_season()
-            return HttpResponseRedirect(reverse('ncl_app:post_season'))
-        else:
-            return HttpResponseRedirect(reverse('ncl_app:regular_season_over'))
+    return league_operation(request, pk, 'play_regular_season', regular_season_result)
+
+
+@require_POST
+def play_regular_season_to_end(request, pk):
+    """ Handles all the remaining regular season games at once
+    """
+    return league_operation(request, pk, 'play_regular_season_to_end', regular_season_result)
+
+
+@require_POST
+def create_post_season(request, pk):
+    """ Handles post season creation
+    """
+    return league_operation(request, pk, 'create_post_season', regular_season_result)
+
+
+def regular_season_result(league):
+    """ Redirects to the page showing where the regular season stands
+    """
+    if league.in_post_season:
+        return HttpResponseRedirect(reverse('ncl_app:post_season'))
+    elif league.schedules_completed:
+        return HttpResponseRedirect(reverse('ncl_app:regular_season_over'))
     else:
         return HttpResponseRedirect(reverse('ncl_app:regular_season_day'))
 
+
+@require_POST
 def play_post_season(request, pk):
     """ Handles post season games
     """
-    league = get_object_or_404(models.League, pk=pk)
-    completed = league.play_post_season()
-    # Always return an HttpResponseRedirect after successfully dealing
-    # with POST data. This prevents data from being posted twice if a
-    # user hits the Back button.
-    if completed:
+    return league_operation(request, pk, 'play_post_season', post_season_result)
+
+
+def post_season_result(league):
+    """ Redirects to the page showing where the post season stands
+    """
+    if league.schedules_completed:
         return HttpResponseRedirect(reverse('ncl_app:post_season_over'))
     else:
         return HttpResponseRedirect(reverse('ncl_app:post_season_day'))
 
 
+def job_status(request, pk):
+    """ Returns the status of a background job, for polling
+    """
+    job = get_object_or_404(models.Job, pk=pk)
+    return JsonResponse(job.as_dict())
+
+
+def export_league(request, pk, export_format):
+    """ Streams every day, match and series of a league as CSV or NDJSON
+        Rows are read in chunks while the response is sent, however many
+        seasons are stored.
+    """
+    if export_format not in export.FORMATS:
+        raise Http404('Unknown export format: ' + export_format)
+    league = get_object_or_404(models.League, pk=pk)
+    response = StreamingHttpResponse(export.export_lines(league, export_format),
+                                     content_type=export.CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = 'attachment; filename="league-' + str(league.pk) + '.' + export_format + '"'
+    return response
+
+
+def league_versions(request):
+    """ returns the versions of the leagues, read once per request
+    """
+    if not hasattr(request, 'league_versions'):
+        request.league_versions = loaders.league_versions()
+    return request.league_versions
+
+
+def leagues_etag(request, *args, **kwargs):
+    """ returns the ETag of a page showing all the leagues, it changes with
+        any league's version
+    """
+    versions = ','.join(str(league_id) + ':' + str(version) for league_id, version, _ in league_versions(request))
+    return hashlib.md5(versions.encode()).hexdigest()
+
+
+def leagues_last_modified(request, *args, **kwargs):
+    """ returns when any of the leagues was last modified
+    """
+    return max([modified for _, _, modified in league_versions(request)] or [None])
+
+
+# Pages showing the leagues answer 304 Not Modified, without loading them,
+# until a league changes
+leagues_condition = method_decorator(condition(etag_func=leagues_etag, last_modified_func=leagues_last_modified),
+                                     name='dispatch')
+
+
 class IndexView(generic.ListView):
     """ Implements index view via a generic list view
         and by passing the first available league by name
@@ -57,7 +171,12 @@ class IndexView(generic.ListView):
     template_name = 'ncl_app/index.html'
     model = models.League
 
+    def get_queryset(self):
+        """ returns the leagues with everything the template reads preloaded """
+        return loaders.league_queryset(teams=True)
+
 
+@leagues_condition
 class RegularSeasonView(generic.ListView):
     """ Implements regular season view via a generic list view
 
@@ -65,8 +184,15 @@ class RegularSeasonView(generic.ListView):
     # Class variables
     template_name = 'ncl_app/regular_season.html'
     model = models.League
+    # leagues come from the cache as a list, not as a League queryset
+    context_object_name = 'league_list'
 
+    def get_queryset(self):
+        """ returns the leagues with everything the template reads preloaded, from the cache """
+        return loaders.cached_leagues('regular_season', versions=league_versions(self.request), days='all')
 
+
+@leagues_condition
 class RegularSeasonDayView(generic.ListView):
     """ Implements regular season day view via a generic list view
 
@@ -74,8 +200,16 @@ class RegularSeasonDayView(generic.ListView):
     # Class variables
     template_name = 'ncl_app/regular_season_day.html'
     model = models.League
+    # leagues come from the cache as a list, not as a League queryset
+    context_object_name = 'league_list'
+
+    def get_queryset(self):
+        """ returns the leagues with everything the template reads preloaded, from the cache """
+        return loaders.cached_leagues('regular_season_day', versions=league_versions(self.request), standings=True,
+                                      days='current')
 
 
+@leagues_condition
 class RegularSeasonOverView(generic.ListView):
     """ Implements regular season over view via a generic list view
 
@@ -83,6 +217,12 @@ class RegularSeasonOverView(generic.ListView):
     # Class variables
     template_name = 'ncl_app/regular_season_over.html'
     model = models.League
+    # leagues come from the cache as a list, not as a League queryset
+    context_object_name = 'league_list'
+
+    def get_queryset(self):
+        """ returns the leagues with everything the template reads preloaded, from the cache """
+        return loaders.cached_leagues('regular_season_over', versions=league_versions(self.request), standings=True)
 
 
 class PostSeasonView(generic.ListView):
@@ -94,6 +234,7 @@ class PostSeasonView(generic.ListView):
     model = models.League
 
 
+@leagues_condition
 class PostSeasonDayView(generic.ListView):
     """ Implements post season day view via a generic list view
 